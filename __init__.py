@@ -13,7 +13,7 @@ bl_info = {
 
 import bpy
 from bpy.app.handlers import persistent
-from . import wire_pole, wire_ops
+from . import wire_pole, wire_ops, wire_stats, wire_pool, wire_cache, wire_network
 
 # wire config
 class WireConfig(bpy.types.PropertyGroup):
@@ -31,6 +31,17 @@ class WireConfig(bpy.types.PropertyGroup):
                                      min = 1,
                                      max = 8192
                                      )
+    # use only as many segments as needed for wire to stay close to curve
+    adaptive_segments : bpy.props.BoolProperty(name="Adaptive Segments",
+                                               description="Use as few segments as needed to keep wire within Max Deviation of curve. Wire Segments is the most segments used",
+                                               default=False)
+    # most distance wire segments can be from curve
+    max_deviation : bpy.props.FloatProperty(name="Max Deviation",
+                                            description="Most distance in meters wire segments can be from curve",
+                                            default = 0.01,
+                                            min = 0.0001,
+                                            max = 3.402823e+38
+                                            )
     # enable/disable catenary wire
     catenary_wire : bpy.props.BoolProperty(name="Catenary", description="Enable catenary", default=False)
     # shade smooth
@@ -51,6 +62,55 @@ class WireConfig(bpy.types.PropertyGroup):
                                        default=4,
                                        min=3,
                                        max=8192)
+    # draw wires as curve objects (blender makes tube from bevel)
+    curve_wire : bpy.props.BoolProperty(name="Curve Wire", description="Draw wires as curve objects. Mesh Wire thickness is made by curve bevel", default=False)
+    # spline type of curve wire
+    curve_type : bpy.props.EnumProperty(items=[("POLY", "Poly", "Curve point at every wire segment", 0),
+                                               ("BEZIER", "Bezier", "Bezier point every Curve Resolution wire segments", 1)],
+                                               name="Curve Type",
+                                               default="POLY")
+    # segments between bezier points
+    curve_resolution : bpy.props.IntProperty(name="Curve Resolution",
+                                             description="Segments blender makes between two bezier points",
+                                             default=4,
+                                             min=1,
+                                             max=64)
+    # draw all wires between selected poles into one object
+    network_mesh : bpy.props.BoolProperty(name="Network Mesh", description="Draw all wires between selected poles into one mesh object", default=False)
+    # run cProfile around draw operator and handlers while recording stats
+    stats_profile : bpy.props.BoolProperty(name="Profile", description="Run cProfile around Draw Wire and update handlers while recording stats", default=False)
+    # draw network with geometry nodes
+    procedural_network : bpy.props.BoolProperty(name="Procedural Network", description="Draw network wires with geometry nodes that follow poles with no python while moving", default=False)
+    # work out wire geometry in process pool
+    parallel_geometry : bpy.props.BoolProperty(name="Parallel Geometry",
+                                               description="Work out geometry of many wires in other processes on all cores, only making meshes in blender",
+                                               default=False)
+    parallel_workers : bpy.props.IntProperty(name="Workers",
+                                             description="Processes to work out wire geometry with (0 for one for every core)",
+                                             default=0,
+                                             min=0,
+                                             max=256)
+    parallel_min_spans : bpy.props.IntProperty(name="Min Wires",
+                                               description="Least wires drawn at once to use processes for (fewer wires are worked out in blender as starting work costs more)",
+                                               default=200,
+                                               min=2,
+                                               max=1000000)
+    # reuse geometry of spans with same length (off by default as cached wires are close to, not exactly, worked out wires)
+    geometry_cache : bpy.props.BoolProperty(name="Geometry Cache",
+                                            description="Keep geometry of recently drawn wires and reuse it for wires with same length, height change and settings (cached wires are stretched, so they can be off by a little less than Cache Precision)",
+                                            default=False)
+    cache_precision : bpy.props.FloatProperty(name="Cache Precision",
+                                              description="Wire lengths and height changes closer than this share cached geometry (wires are stretched to end exactly at mushrooms)",
+                                              default=0.001,
+                                              min=0.000001,
+                                              max=1.0,
+                                              precision=4,
+                                              subtype="DISTANCE")
+    cache_size : bpy.props.IntProperty(name="Cache Size",
+                                       description="Most memory in megabytes cached geometry can use, least recently used wires are dropped first",
+                                       default=64,
+                                       min=1,
+                                       max=65536)
     # update mode
     update_mode : bpy.props.EnumProperty(items=[("MANUAL", "Manual", "Update wire when button pressed", 0),
                                                 ("AUTO", "Auto", "Update wire when config changes or pole is moved", 1)],
@@ -58,6 +118,59 @@ class WireConfig(bpy.types.PropertyGroup):
                                                 description="When to update wire",
                                                 default="MANUAL"
                                                 )
+    # draw cheap wires while pole is moving in auto mode
+    # off by default as preview wires have other vertices than full wires, so wires are drawn again (not rewritten) twice every drag
+    preview_while_moving : bpy.props.BoolProperty(name="Preview While Moving",
+                                                  description="Draw edge wires with fewer segments while pole is moving and full wires once it stops (wires and network meshes are drawn again when preview starts and ends, only worth it for slow wires)",
+                                                  default=False)
+    # segments of wire while pole is moving
+    preview_segments : bpy.props.IntProperty(name="Preview Segments",
+                                             description="Most segments wire has while pole is moving",
+                                             default=8,
+                                             min=1,
+                                             max=8192)
+    # time pole has to stop moving before full wires are drawn
+    preview_delay : bpy.props.FloatProperty(name="Preview Delay",
+                                            description="Seconds pole has to stop moving before full wires are drawn",
+                                            default=0.5,
+                                            min=0.05,
+                                            max=60.0,
+                                            subtype="TIME_ABSOLUTE",
+                                            unit="TIME_ABSOLUTE")
+    # enable/disable level of detail from camera
+    lod_enabled : bpy.props.BoolProperty(name="Level Of Detail",
+                                         description="Use fewer segments and sides for wires that look small from scene camera",
+                                         default=False)
+    # wire size on screen that gets full detail
+    lod_full_pixels : bpy.props.FloatProperty(name="Full Detail Size",
+                                              description="Wires at least this many pixels long from camera use full segments and sides. Detail halves every time size halves",
+                                              default=400.0,
+                                              min=1.0,
+                                              max=100000.0,
+                                              subtype="PIXEL")
+    # least detail wires can have
+    lod_min_segments : bpy.props.IntProperty(name="Min Segments",
+                                             description="Least segments wire gets from level of detail",
+                                             default=2,
+                                             min=1,
+                                             max=8192)
+    lod_min_sides : bpy.props.IntProperty(name="Min Wire Sides",
+                                          description="Least sides mesh wire gets from level of detail",
+                                          default=3,
+                                          min=3,
+                                          max=8192)
+    lod_min_ball_sides : bpy.props.IntProperty(name="Min Ball Sides",
+                                               description="Least sides wire ball gets from level of detail",
+                                               default=4,
+                                               min=1,
+                                               max=8192)
+    # how far camera moves before level of detail is worked out again
+    lod_camera_threshold : bpy.props.FloatProperty(name="Camera Threshold",
+                                                   description="Distance in meters camera has to move before level of detail is worked out again",
+                                                   default=5.0,
+                                                   min=0.0,
+                                                   max=3.402823e+38,
+                                                   subtype="DISTANCE")
     # enable/disable wire balls
     wire_balls_enabled : bpy.props.BoolProperty(name="Wire Balls", description="Enable/disable wire balls", default = False)
     # change wire ball radius
@@ -75,6 +188,20 @@ class WireConfig(bpy.types.PropertyGroup):
                                             min = 1,
                                             max = 8192,
                                             )
+    # uv sphere or icosphere balls
+    wire_ball_topology : bpy.props.EnumProperty(items=[("UV", "UV Sphere", "Rings of Wire Ball Sides vertices", 0),
+                                                       ("ICO", "Icosphere", "Evenly spread vertices, most that fit in Ball Vertex Budget", 1)],
+                                                name="Wire Ball Topology",
+                                                description="How wire ball vertices are laid out",
+                                                default="UV"
+                                                )
+    # most vertices of icosphere ball
+    wire_ball_budget : bpy.props.IntProperty(name="Ball Vertex Budget",
+                                             description="Most vertices of icosphere wire ball (12, 42, 162, 642, ... are used)",
+                                             default=162,
+                                             min=12,
+                                             max=100000,
+                                             )
     # change wire ball quantity
     wire_ball_amount : bpy.props.IntProperty(name="Wire Ball Amount",
                                              description="Amount of wire balls",
@@ -86,6 +213,11 @@ class WireConfig(bpy.types.PropertyGroup):
 @persistent
 # update handler for selection change
 def selection_change_handler(scene):
+    with wire_stats.measure("selection handler"):
+        update_selection(scene)
+
+# updates selection order if selection changed
+def update_selection(scene):
     # make sure user in object mode
     if bpy.context.mode != "OBJECT":
         return
@@ -98,14 +230,48 @@ def selection_change_handler(scene):
 @persistent
 # update handler for pole position or config change
 def pole_change_handler(scene):
+    with wire_stats.measure("update handler"):
+        update_moved_poles(scene)
+
+# only wires connected to poles that moved in this update are redrawn (once each)
+def update_moved_poles(scene):
     if bpy.context.mode != "OBJECT":
         return
+    if bpy.context.scene.wire_config.update_mode != "AUTO":
+        return
+    moved_objects = {}
+    camera_moved = False
+    collection_changed = False
     for update in bpy.context.view_layer.depsgraph.updates:
-        if update.is_updated_transform:
-            if bpy.context.scene.wire_config.update_mode == "AUTO":
-                wire_ops.update_wire()
-                wire_ops.update_wire_between_verts()
-            break
+        # objects were added to or deleted from collection
+        if isinstance(update.id, bpy.types.Collection):
+            collection_changed = True
+        if update.is_updated_transform and isinstance(update.id, bpy.types.Object):
+            obj = update.id.original
+            if obj == scene.camera:
+                camera_moved = True
+            # skip wires and other objects with no wires connected
+            # and poles with wires drawn by geometry nodes (they move with pole by themselves)
+            if wire_ops.has_wires(obj) and not wire_ops.is_procedural_pole(obj):
+                moved_objects[obj.name] = obj
+    if moved_objects:
+        moved_objects = list(moved_objects.values())
+        config = bpy.context.scene.wire_config
+        if config.preview_while_moving:
+            # cheap wires now, full wires when poles stop moving
+            preview_settings = wire_ops.get_preview_settings()
+            wire_ops.update_wire(moved_objects, preview_settings)
+            wire_ops.update_wire_between_verts(moved_objects, preview_settings)
+            wire_ops.schedule_full_update(moved_objects, config.preview_delay)
+        else:
+            wire_ops.update_wire(moved_objects)
+            wire_ops.update_wire_between_verts(moved_objects)
+    # procedural networks do not run python when poles move, so deleted poles are only found here
+    if collection_changed:
+        wire_ops.update_deleted_poles()
+    # level of detail depends on camera position
+    if camera_moved:
+        wire_ops.update_lod()
 
 # main menu
 class WireUI(bpy.types.Panel):
@@ -128,6 +294,11 @@ class WireUI(bpy.types.Panel):
         r2 = col.row(align=True)
         r2c1 = r2.column(align=True)
         r2c1.prop(config, "update_mode", text="Update Mode")
+        if config.update_mode == "AUTO":
+            r2c1.prop(config, "preview_while_moving", text="Preview While Moving")
+            if config.preview_while_moving:
+                r2c1.prop(config, "preview_segments", text="Preview Segments")
+                r2c1.prop(config, "preview_delay", text="Preview Delay")
 
         # second section
         col = layout.column()
@@ -139,6 +310,7 @@ class WireUI(bpy.types.Panel):
         # button to update wire
         col.operator("wire_ops.manual_update_wire", text="Update Wire")
         col.operator("wire_ops.wire_between_vertices", text="Wire Between Vertices")
+        col.operator("wire_ops.build_routes", text="Build Routes")
 
 # dropdown menu under main manu
 class WireSubUI(bpy.types.Panel):
@@ -155,12 +327,57 @@ class WireSubUI(bpy.types.Panel):
         config = context.scene.wire_config
         # buttons to change more wire options
         col.prop(config, "catenary_wire", text="Catenary")
+        col.prop(config, "adaptive_segments", text="Adaptive Segments")
+        if config.adaptive_segments:
+            col.prop(config, "max_deviation", text="Max Deviation")
         col.prop(config, "shade_wire_smooth", text="Shade Smooth")
         col.prop(config, "thick_wire", text="Mesh Wire")
         col.prop(config, "wire_thickness", text="Wire Thickness")
         col.prop(config, "wire_sides", text="Wire Sides")
+        col.prop(config, "curve_wire", text="Curve Wire")
+        if config.curve_wire:
+            col.prop(config, "curve_type", text="Curve Type")
+            col.prop(config, "curve_resolution", text="Curve Resolution")
+        col.prop(config, "network_mesh", text="Network Mesh")
+        if config.network_mesh:
+            col.prop(config, "procedural_network", text="Procedural Network")
+        col.prop(config, "parallel_geometry", text="Parallel Geometry")
+        if config.parallel_geometry:
+            col.prop(config, "parallel_workers", text="Workers")
+            col.prop(config, "parallel_min_spans", text="Min Wires")
+        col.prop(config, "geometry_cache", text="Geometry Cache")
+        if config.geometry_cache:
+            col.prop(config, "cache_precision", text="Cache Precision")
+            col.prop(config, "cache_size", text="Cache Size (MB)")
+            cache_state = wire_cache.cache_state
+            col.label(text=f"{len(wire_cache.entries)} wires, {cache_state['bytes']/2**20:.1f} MB, {cache_state['hits']} hits, {cache_state['misses']} misses")
         col.operator("wire_ops.remove_wire_props", text="Delete Wire Props")
 
+# dropdown menu with time and counts of each stage of drawing wires
+class WireStatsUI(bpy.types.Panel):
+    bl_idname = "WIRE_PT_stats_ui"
+    bl_parent_id = "WIRE_PT_ops_ui"
+    bl_label = "Stats"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "Wire"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context):
+        col = self.layout.column()
+        config = context.scene.wire_config
+        recording = wire_stats.state["enabled"]
+        col.operator("wire_stats.toggle_stats", text="Stop Recording" if recording else "Record Stats", depress=recording)
+        col.prop(config, "stats_profile", text="Profile")
+        # seconds and calls of every stage
+        for stage, (seconds, calls) in wire_stats.stages.items():
+            col.label(text=f"{stage}: {seconds*1000:.1f} ms ({calls} calls)")
+        for counter, amount in wire_stats.counters.items():
+            col.label(text=f"{counter}: {amount}")
+        row = col.row(align=True)
+        row.operator("wire_stats.reset_stats", text="Reset")
+        row.operator("wire_stats.dump_stats", text="Save Stats")
+
 # dropdown menu with wire ball configuration
 class WireBallsUI(bpy.types.Panel):
     bl_idname = "WIRE_PT_balls_ui"
@@ -177,9 +394,34 @@ class WireBallsUI(bpy.types.Panel):
         # buttons to change settings regarding balls
         col.prop(config, "wire_balls_enabled", text="Enable Wire Balls")
         col.prop(config, "wire_ball_radius", text="Wire Ball Radius")
-        col.prop(config, "wire_ball_sides", text="Wire Ball Sides")
+        col.prop(config, "wire_ball_topology", text="Topology")
+        if config.wire_ball_topology == "ICO":
+            col.prop(config, "wire_ball_budget", text="Ball Vertex Budget")
+        else:
+            col.prop(config, "wire_ball_sides", text="Wire Ball Sides")
         col.prop(config, "wire_ball_amount", text="Wire Ball Amount")
 
+# dropdown menu with level of detail configuration
+class WireLodUI(bpy.types.Panel):
+    bl_idname = "WIRE_PT_lod_ui"
+    bl_parent_id = "WIRE_PT_ops_ui"
+    bl_label = "Level Of Detail"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "Wire"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context):
+        col = self.layout.column()
+        config = context.scene.wire_config
+        # buttons to change level of detail settings
+        col.prop(config, "lod_enabled", text="Enable Level Of Detail")
+        col.prop(config, "lod_full_pixels", text="Full Detail Size")
+        col.prop(config, "lod_min_segments", text="Min Segments")
+        col.prop(config, "lod_min_sides", text="Min Wire Sides")
+        col.prop(config, "lod_min_ball_sides", text="Min Ball Sides")
+        col.prop(config, "lod_camera_threshold", text="Camera Threshold")
+
 # dropdown menu with pole operators 
 class WirePoleUI(bpy.types.Panel):
     bl_idname = "WIRE_PT_pole_ui"
@@ -196,6 +438,7 @@ class WirePoleUI(bpy.types.Panel):
         col.operator("wire_pole.create_pole_input", text="Create Pole Input")
         col.operator("wire_pole.create_pole_output", text="Create Pole Output")
         col.operator("wire_pole.delete_pole", text="Delete Pole")
+        col.operator("wire_pole.embed_poles", text="Embed Poles")
         col.operator("wire_pole.print_poles", text="Print Pole") #<-- debug
 
 # classes that will be registered
@@ -204,14 +447,21 @@ classesToRegister = [
     wire_ops.RemoveWireProps,
     wire_ops.ManualUpdateWire,
     wire_ops.WireBetweenVertices,
+    wire_ops.BuildRoutes,
     wire_pole.CreatePoleInput,
     wire_pole.CreatePoleOutput,
     wire_pole.PrintPoles,
     wire_pole.DeletePole,
+    wire_pole.EmbedPoles,
+    wire_stats.ToggleStats,
+    wire_stats.ResetStats,
+    wire_stats.DumpStats,
     WireConfig,
     WireUI,
     WireSubUI,
     WireBallsUI,
+    WireLodUI,
+    WireStatsUI,
     WirePoleUI,
 ]
 
@@ -228,6 +478,14 @@ def unregister():
     del bpy.types.Scene.wire_config
     bpy.app.handlers.depsgraph_update_post.remove(selection_change_handler)
     bpy.app.handlers.depsgraph_update_post.remove(pole_change_handler)
+    if bpy.app.timers.is_registered(wire_ops.run_full_update):
+        bpy.app.timers.unregister(wire_ops.run_full_update)
+    # put back functions timed by stats
+    wire_stats.disable()
+    # stop processes working out wire geometry
+    wire_pool.shutdown()
+    wire_cache.clear()
+    wire_network.clear_co_cache()
     # unregister classes
     for cls in classesToRegister:
         bpy.utils.unregister_class(cls)
@@ -0,0 +1,229 @@
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+# bpy is only imported when blender runs this script, process pool workers (plain python)
+# import this script again as __mp_main__ and would fail on bpy
+if __name__ == "__main__":
+    import bpy
+
+# times drawing, updating and deleting wires in synthetic scenes without opening blender window:
+# blender --background --factory-startup --python benchmark.py -- --sizes 10 1000 10000 --output results.json
+# every result has seconds (best of repeats) and objects, vertices and faces of wires in scene after it ran
+
+# pole used for benchmarks, embedded in scene so pole library is not changed
+BENCH_POLE = "bench_pole"
+BENCH_MUSHROOMS = [(-1.0, 0.0, 10.0), (0.0, 0.0, 10.5), (1.0, 0.0, 10.0)]
+# distance between poles in meters
+POLE_SPACING = 40.0
+
+# arguments after "--" are for this script
+def get_arguments():
+    argv = sys.argv[sys.argv.index("--")+1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Benchmark wire drawing and updating")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000], help="amounts of poles in scenes")
+    parser.add_argument("--repeat", type=int, default=3, help="times each case runs (best time is kept)")
+    parser.add_argument("--output", default="benchmark_results.json", help="json file to write results to")
+    return parser.parse_args(argv)
+
+# imports plugin from directory of this file and registers it if it is not enabled
+def get_addon():
+    addon_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.dirname(addon_dir))
+    addon = importlib.import_module(os.path.basename(addon_dir))
+    if not hasattr(bpy.types.Scene, "wire_config"):
+        addon.register()
+    return addon
+
+# makes pole object and embeds its mushrooms in scene
+def make_bench_pole(addon):
+    mesh = bpy.data.meshes.new(BENCH_POLE)
+    mesh.from_pydata([(0.0, 0.0, 0.0), (0.0, 0.0, 10.0)] + BENCH_MUSHROOMS, [(0, 1)], [])
+    template = bpy.data.objects.new(BENCH_POLE, mesh)
+    pole = {"input": BENCH_MUSHROOMS, "output": BENCH_MUSHROOMS}
+    bpy.context.scene["wire_poles"] = {BENCH_POLE: addon.wire_pole.pack_pole(pole)}
+    return template
+
+# places count linked duplicates of pole in a line (with small height changes) and selects them in order
+def make_poles(addon, template, count):
+    collection = bpy.data.collections.new("bench_poles")
+    bpy.context.scene.collection.children.link(collection)
+    poles = []
+    for i in range(count):
+        obj = bpy.data.objects.new(template.name, template.data)
+        obj.location = (i*POLE_SPACING, 0.0, (i % 7)*0.5)
+        collection.objects.link(obj)
+        poles.append(obj)
+    bpy.context.view_layer.update()
+    select_poles(addon, poles)
+    return poles, collection
+
+# selects poles in order they are given (as if selected by hand one after another)
+def select_poles(addon, poles):
+    for obj in bpy.context.view_layer.objects:
+        obj.select_set(False)
+    for obj in poles:
+        obj.select_set(True)
+    addon.wire_ops.selection_order[:] = [obj.name for obj in poles]
+    bpy.context.view_layer.objects.active = poles[0]
+
+# gets objects, vertices and faces of everything in scene that is not a pole
+def count_wires(poles):
+    pole_names = {obj.name for obj in poles}
+    objects = vertices = faces = 0
+    for obj in bpy.context.scene.objects:
+        if obj.name in pole_names:
+            continue
+        objects += 1
+        if obj.type == "MESH":
+            vertices += len(obj.data.vertices)
+            faces += len(obj.data.polygons)
+        elif obj.type == "CURVE":
+            vertices += sum(len(spline.points) + len(spline.bezier_points) for spline in obj.data.splines)
+    return {"objects": objects, "vertices": vertices, "faces": faces}
+
+# runs function repeat times (setup before each run is not timed), returns best time
+def best_time(function, repeat, setup=None):
+    times = []
+    for i in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+# sets wire config for case (other options are left at defaults)
+# geometry cache is cleared so case does not time wires cached by cases before it
+def set_config(addon, **values):
+    addon.wire_cache.clear()
+    config = bpy.context.scene.wire_config
+    for name in ("droop", "segments", "catenary_wire", "thick_wire", "wire_sides", "wire_balls_enabled", "wire_ball_amount", "network_mesh", "lod_enabled", "curve_wire", "adaptive_segments", "parallel_geometry", "parallel_workers", "parallel_min_spans", "geometry_cache"):
+        config.property_unset(name)
+    # handlers are only timed in handler case
+    config.update_mode = "MANUAL"
+    for name, value in values.items():
+        setattr(config, name, value)
+
+def draw_wires():
+    bpy.ops.wire_ops.draw_parabolic()
+
+def remove_wires():
+    bpy.ops.wire_ops.remove_wire_props()
+
+# moves every pole a little so wires have to be updated
+def move_poles(poles, offset):
+    for obj in poles:
+        obj.location.y = offset
+    bpy.context.view_layer.update()
+
+# times selection change with and without handlers of plugin (handlers should cost almost nothing for it)
+def handler_overhead(addon, poles, repeat):
+    handlers = bpy.app.handlers.depsgraph_update_post
+    bpy.context.scene.wire_config.update_mode = "AUTO"
+    def toggle_selection():
+        for obj in poles[:100]:
+            obj.select_set(not obj.select_get())
+            bpy.context.view_layer.update()
+    with_handlers = best_time(toggle_selection, repeat)
+    plugin_handlers = [handler for handler in handlers if handler in (addon.selection_change_handler, addon.pole_change_handler)]
+    for handler in plugin_handlers:
+        handlers.remove(handler)
+    try:
+        without_handlers = best_time(toggle_selection, repeat)
+    finally:
+        for handler in plugin_handlers:
+            handlers.append(handler)
+    bpy.context.scene.wire_config.update_mode = "MANUAL"
+    updates = min(len(poles), 100)
+    return {"seconds": with_handlers, "seconds_without_handlers": without_handlers, "overhead_per_update": (with_handlers - without_handlers)/updates}
+
+# runs all cases for scene with count poles
+def run_size(addon, template, count, repeat):
+    poles, collection = make_poles(addon, template, count)
+    results = []
+    def record(case, seconds, **extra):
+        result = {"poles": count, "case": case, "seconds": seconds}
+        result.update(count_wires(poles))
+        result.update(extra)
+        results.append(result)
+        print(f"{count} poles, {case}: {seconds:.4f} s")
+
+    # drawing with different wire types (wires of last run are deleted before next one)
+    draw_cases = [
+        ("draw_parabola", {}),
+        ("draw_catenary", {"catenary_wire": True}),
+        ("draw_straight", {"droop": 0.0}),
+        ("draw_network", {"network_mesh": True}),
+    ]
+    draw_cases += [(f"draw_mesh_sides_{sides}", {"thick_wire": True, "wire_sides": sides}) for sides in (4, 8, 16, 32)]
+    draw_cases += [(f"draw_balls_{amount}", {"wire_balls_enabled": True, "wire_ball_amount": amount}) for amount in (1, 5, 20)]
+    # two workers and no least amount of wires so pool is used for every scene size, even on one core
+    draw_cases += [("draw_mesh_parallel", {"thick_wire": True, "parallel_geometry": True, "parallel_workers": 2, "parallel_min_spans": 2, "geometry_cache": False})]
+    for case, values in draw_cases:
+        set_config(addon, **values)
+        pool_spans = addon.wire_pool.pool_state["spans"]
+        record(case, best_time(draw_wires, repeat, setup=remove_wires), **values)
+        # parallel case should not time geometry worked out in blender after pool failed
+        if values.get("parallel_geometry", False) and addon.wire_pool.pool_state["spans"] == pool_spans:
+            raise RuntimeError(f"{case} did not use process pool")
+
+    # geometry cache off and on, cold cache is cleared before every run and warm cache keeps wires of run before
+    def remove_and_clear():
+        remove_wires()
+        addon.wire_cache.clear()
+    cache_cases = [
+        ("draw_mesh_cache_off", {"thick_wire": True, "geometry_cache": False}, remove_wires),
+        ("draw_mesh_cache_cold", {"thick_wire": True, "geometry_cache": True}, remove_and_clear),
+        ("draw_mesh_cache_warm", {"thick_wire": True, "geometry_cache": True}, remove_wires),
+    ]
+    for case, values, setup in cache_cases:
+        set_config(addon, **values)
+        record(case, best_time(draw_wires, repeat, setup=setup), **values)
+
+    # updating wires drawn with default config
+    set_config(addon)
+    remove_wires()
+    draw_wires()
+    offsets = iter(range(1, 1000))
+    # same settings, vertices are rewritten in place
+    record("update_wire_moved", best_time(lambda: addon.wire_ops.update_wire(poles), repeat, setup=lambda: move_poles(poles, next(offsets)*0.1)))
+    # same with geometry cache (spans keep their shape when moved, so only first run works them out)
+    set_config(addon, geometry_cache=True)
+    record("update_wire_moved_cache", best_time(lambda: addon.wire_ops.update_wire(poles), repeat, setup=lambda: move_poles(poles, next(offsets)*0.1)), geometry_cache=True)
+    set_config(addon)
+    # other segments, wires are drawn again
+    segments = iter((8, 16)*repeat)
+    def change_segments():
+        bpy.context.scene.wire_config.segments = next(segments)
+    record("update_wire_redraw", best_time(lambda: addon.wire_ops.update_wire(poles), repeat, setup=change_segments))
+    record("handler_selection_only", **handler_overhead(addon, poles, repeat))
+
+    # deleting wires
+    set_config(addon)
+    def redraw():
+        select_poles(addon, poles)
+        draw_wires()
+    record("remove_wire_props", best_time(remove_wires, repeat, setup=redraw))
+
+    for obj in poles:
+        bpy.data.objects.remove(obj)
+    bpy.data.collections.remove(collection)
+    return results
+
+def main():
+    args = get_arguments()
+    addon = get_addon()
+    template = make_bench_pole(addon)
+    results = []
+    for count in args.sizes:
+        results += run_size(addon, template, count, args.repeat)
+    output = {"blender": bpy.app.version_string, "repeat": args.repeat, "results": results}
+    with open(args.output, "w") as f:
+        json.dump(output, f, indent=2)
+    print(f"wrote {len(results)} results to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+import argparse
+import json
+import math
+import os
+import sys
+import timeit
+import numpy as np
+
+# checks wire geometry against math plugin used before it was moved to wire_geometry and times it
+# runs in plain python with numpy, blender is not needed:
+# python benchmark_geometry.py --spans 1000 --output geometry_results.json
+# exits with 1 if geometry does not match
+
+# wire_geometry does not import blender, so it is imported on its own (not as part of plugin)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import wire_geometry
+
+# spans checked (start, end), with height changes, diagonal and short spans
+CHECK_SPANS = [
+    ((0.0, 0.0, 10.0), (40.0, 0.0, 10.0)),
+    ((0.0, 0.0, 10.0), (30.0, 20.0, 12.5)),
+    ((5.0, -3.0, 8.0), (-25.0, 10.0, 6.0)),
+    ((0.0, 0.0, 0.0), (3.0, 0.0, 0.5)),
+]
+# largest difference allowed in meters
+TOLERANCE = 1e-9
+
+# arguments
+def get_arguments():
+    parser = argparse.ArgumentParser(description="Check and time wire geometry without blender")
+    parser.add_argument("--spans", type=int, default=1000, help="amount of spans timed")
+    parser.add_argument("--repeat", type=int, default=5, help="times each case runs (best time is kept)")
+    parser.add_argument("--output", help="json file to write results to")
+    return parser.parse_args()
+
+# z of parabola wire as plugin worked it out before (x is distance from midpoint of previous point)
+def reference_parabola_z(x, p_segment, pole_dist, droop):
+    a = droop/((pole_dist**2)/4)
+    return a*((x+p_segment)**2)
+
+# points of parabola wire as draw_parabolic made them before
+def reference_parabola_points(start, end, droop, w_segment):
+    start_x, start_y, start_z = start
+    end_x, end_y, end_z = end
+    pole_dist = math.sqrt((end_x-start_x)**2 + (end_y-start_y)**2 + (end_z-start_z)**2)
+    p_segment = pole_dist/w_segment
+    co_list = [(start_x, start_y, start_z)]
+    x = -(pole_dist/2)
+    for i in range(1, w_segment):
+        wire_z = reference_parabola_z(x, p_segment, pole_dist, droop) + ((start_z+(i*((end_z-start_z)/w_segment)))-droop)
+        co_list.append(((start_x+(i*((end_x-start_x)/w_segment))), (start_y+(i*((end_y-start_y)/w_segment))), wire_z))
+        x += p_segment
+    co_list.append((end_x, end_y, end_z))
+    return co_list
+
+# catenary constant found by bisection (plugin stepped constant by 0.1 until wire was within 0.5 m of mushroom,
+# so it is checked against exact constant instead)
+def reference_catenary_constant(pole_dist, droop):
+    half_dist = pole_dist/2
+    low, high = 1e-6, 1e9
+    for i in range(200):
+        a = (low+high)/2
+        # sag gets smaller as a gets bigger
+        if a*(math.cosh(half_dist/a) - 1) > droop:
+            low = a
+        else:
+            high = a
+    return (low+high)/2
+
+# points of catenary wire with constant from reference_catenary_constant
+def reference_catenary_points(start, end, droop, w_segment):
+    pole_dist = math.dist(start, end)
+    a = reference_catenary_constant(pole_dist, droop)
+    co_list = []
+    for i in range(w_segment+1):
+        t = i/w_segment
+        x = pole_dist*(t-0.5)
+        point = [s+(e-s)*t for s, e in zip(start, end)]
+        point[2] += a*math.cosh(x/a) - a - droop
+        co_list.append(tuple(point))
+    co_list[0] = tuple(start)
+    co_list[-1] = tuple(end)
+    return co_list
+
+# vertices and faces of ball as draw_ball made them before (centered at origin)
+# (sides rings, about twice what uv sphere needs, so only timed against ball_data)
+def reference_ball(radius, sides):
+    h_angle_increment = (2*math.pi)/sides
+    c_list = [(0.0, 0.0, -radius)]
+    f_list = []
+    h_angle = 0
+    v_angle = -math.pi/2
+    h_circle_count = sides
+    v_angle_increment = (2*math.pi)/(2*h_circle_count)
+    for h_circle in range(h_circle_count):
+        v_angle += v_angle_increment
+        for i in range(sides):
+            h_radius = radius*math.cos(v_angle)
+            c_list.append((h_radius*math.cos(h_angle), h_radius*math.sin(h_angle), radius*math.sin(v_angle)))
+            h_angle += h_angle_increment
+    c_list.append((0.0, 0.0, radius))
+    for v in range(1, sides+1):
+        f_list.append((1, v, 0) if v == sides else (v+1, v, 0))
+    for circle in range(h_circle_count-1):
+        for v in range(sides):
+            v += 1 + (sides*(circle+1))
+            if v == (sides*(circle+2)):
+                f_list.append((v, v-sides, v-sides-sides+1, v-sides+1))
+            else:
+                f_list.append((v, v-sides, v-sides+1, v+1))
+    for v in range(sides):
+        v += 1 + sides*(h_circle_count-1)
+        h = len(c_list)-1
+        f_list.append((h, v, v-sides+1) if v == (sides*h_circle_count) else (h, v, v+1))
+    return c_list, f_list
+
+# ball centers as make_balls placed them before (parabola)
+def reference_ball_positions(start, end, droop, amount):
+    start_x, start_y, start_z = start
+    end_x, end_y, end_z = end
+    pole_dist = math.sqrt((end_x-start_x)**2 + (end_y-start_y)**2 + (end_z-start_z)**2)
+    a = droop/((pole_dist**2)/4)
+    p_segment = pole_dist/(amount+1)
+    x = -(pole_dist/2)
+    positions = []
+    for i in range(1, amount+1):
+        positions.append((
+            i*(end_x-start_x)/(amount+1) + start_x,
+            i*(end_y-start_y)/(amount+1) + start_y,
+            a*((x+p_segment))**2 + (i*(end_z-start_z)/(amount+1) + start_z-droop),
+        ))
+        x += p_segment
+    return positions
+
+# faces of tube as parabolic_wire_3d made them before (rings of sides vertices, then start and end caps)
+def reference_tube_faces(point_count, sides):
+    vertex_count = point_count*sides
+    f_list = []
+    for i in range(vertex_count-sides):
+        if i%sides == 0:
+            f_list.append((i, i+sides, i+sides+sides-1, i+sides-1))
+        else:
+            f_list.append((i, i+sides, i+sides-1, i-1))
+    f_list.append([(sides-1)-i for i in range(sides)])
+    f_list.append([vertex_count-sides+i for i in range(sides)])
+    return f_list
+
+# checks ball is closed (vertices - edges + faces is 2), round and faces point out
+# returns largest difference of vertex from radius (inf if ball is not closed, faces point in or it has vertex_count wrong)
+def check_ball(vertices, faces, radius, vertex_count):
+    loops, sizes = faces
+    face_list = np.split(loops, np.cumsum(sizes)[:-1])
+    edges = {tuple(sorted(edge)) for face in face_list for edge in zip(face.tolist(), np.roll(face, -1).tolist())}
+    if len(vertices) != vertex_count or len(vertices) - len(edges) + len(face_list) != 2:
+        return math.inf
+    for face in face_list:
+        points = vertices[face]
+        if np.dot(np.cross(points[1]-points[0], points[2]-points[0]), points.mean(axis=0)) <= 0:
+            return math.inf
+    return max_difference(np.linalg.norm(vertices, axis=1), np.full(len(vertices), radius))
+
+# gets largest difference between two arrays (inf if shapes differ)
+def max_difference(a, b):
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    if a.shape != b.shape:
+        return math.inf
+    return float(np.max(np.abs(a-b))) if a.size else 0.0
+
+# checks geometry, returns list of (check, largest difference)
+def check_parity():
+    results = []
+    for start, end in CHECK_SPANS:
+        for segments in (2, 7, 16, 33):
+            points = wire_geometry.sample_span(start, end, 1.5, segments, False)
+            results.append((f"parabola {segments} segments", max_difference(points, reference_parabola_points(start, end, 1.5, segments))))
+            points = wire_geometry.sample_span(start, end, 1.5, segments, True)
+            results.append((f"catenary {segments} segments", max_difference(points, reference_catenary_points(start, end, 1.5, segments))))
+        for amount in (1, 4, 9):
+            positions = wire_geometry.ball_positions(start, end, 1.5, amount, False)
+            results.append((f"ball positions {amount}", max_difference(positions, reference_ball_positions(start, end, 1.5, amount))))
+    # batched spans are same as spans one by one
+    starts = [span[0] for span in CHECK_SPANS]
+    ends = [span[1] for span in CHECK_SPANS]
+    for catenary_enabled in (False, True):
+        batched = wire_geometry.sample_spans(starts, ends, 1.5, 16, catenary_enabled)
+        single = [wire_geometry.sample_span(start, end, 1.5, 16, catenary_enabled) for start, end in CHECK_SPANS]
+        results.append((f"batched spans (catenary {catenary_enabled})", max_difference(batched, single)))
+    # spans_parts (spans grouped by settings) makes same parts as span_parts one by one
+    settings = wire_geometry.WireSettings(1.5, 16, False, False, 0.05, 8, True, True, 0.3, 16, 3)
+    for name, span_settings in (
+        ("edge", settings),
+        ("tube catenary", settings._replace(thick=True, catenary=True)),
+        ("straight tube", settings._replace(droop=0.0, thick=True)),
+        ("adaptive", settings._replace(max_deviation=0.01)),
+    ):
+        tasks = [(start, end, span_settings) for start, end in CHECK_SPANS] + [(start, end, settings) for start, end in CHECK_SPANS]
+        difference = 0.0
+        for grouped, (start, end, task_settings) in zip(wire_geometry.spans_parts(tasks), tasks):
+            vertices, edges, (loops, sizes), centers = wire_geometry.span_parts(start, end, task_settings)
+            difference = max(difference, max_difference(grouped[0], vertices), max_difference(grouped[3], centers),
+                             max_difference(grouped[1], edges), max_difference(grouped[2][0], loops), max_difference(grouped[2][1], sizes))
+        results.append((f"grouped span parts {name}", difference))
+
+    for sides in (4, 8, 16):
+        # rings of sides vertices between top and bottom vertex
+        vertices, faces = wire_geometry.ball_data(0.3, sides)
+        results.append((f"uv ball {sides} sides", check_ball(vertices, faces, 0.3, (wire_geometry.ball_rings(sides)-1)*sides + 2)))
+    for budget in (12, 42, 100, 162, 642):
+        level = wire_geometry.ico_level(budget)
+        vertices, faces = wire_geometry.ball_data(0.3, 16, budget)
+        results.append((f"ico ball budget {budget}", check_ball(vertices, faces, 0.3, 10*4**level + 2)))
+
+    # tube vertices were made by rotating points with mathutils before, so tube is checked by what it has to be:
+    # same faces, every ring at radius around its path point and square to wire
+    for sides in (4, 8, 16):
+        path = wire_geometry.sample_span(CHECK_SPANS[1][0], CHECK_SPANS[1][1], 1.5, 10, False)
+        vertices, (loops, sizes) = wire_geometry.tube_data(path, 0.05, sides)
+        faces = np.split(loops, np.cumsum(sizes)[:-1])
+        results.append((f"tube faces {sides} sides", 0.0 if [list(face) for face in faces] == [list(face) for face in reference_tube_faces(len(path), sides)] else math.inf))
+        offsets = vertices.reshape(len(path), sides, 3) - path[:, None, :]
+        results.append((f"tube radius {sides} sides", max_difference(np.linalg.norm(offsets, axis=2), np.full((len(path), sides), 0.05))))
+        tangents = wire_geometry.path_frames(path[None])[0][0]
+        results.append((f"tube rings square to wire {sides} sides", float(np.max(np.abs(np.einsum("psk,pk->ps", offsets, tangents))))))
+    return results
+
+# random spans of about standard length for timing
+def make_spans(count):
+    rng = np.random.default_rng(0)
+    starts = np.zeros((count, 3))
+    starts[:, 0] = np.arange(count)*40.0
+    starts[:, 2] = 10.0 + rng.uniform(-1, 1, count)
+    ends = starts + np.stack((np.full(count, 40.0), rng.uniform(-5, 5, count), rng.uniform(-1, 1, count)), axis=1)
+    return starts, ends
+
+# runs function repeat times, returns best time
+def best_time(function, repeat):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+# times geometry functions with span_count spans, returns list of (case, seconds)
+def run_benchmarks(span_count, repeat):
+    starts, ends = make_spans(span_count)
+    spans = list(zip(starts.tolist(), ends.tolist()))
+    pole_dist = np.linalg.norm(ends-starts, axis=1)
+    settings = wire_geometry.WireSettings(1.5, 16, False, True, 0.05, 8, True, True, 0.3, 16, 5)
+    edge_settings = settings._replace(thick=False, balls_enabled=False)
+    paths = wire_geometry.sample_spans(starts, ends, 1.5, 16, False)
+    cases = [
+        ("reference parabola loop", lambda: [reference_parabola_points(start, end, 1.5, 16) for start, end in spans]),
+        ("sample_span per span", lambda: [wire_geometry.sample_span(start, end, 1.5, 16, False) for start, end in spans]),
+        ("sample_spans batched", lambda: wire_geometry.sample_spans(starts, ends, 1.5, 16, False)),
+        ("sample_spans batched catenary", lambda: wire_geometry.sample_spans(starts, ends, 1.5, 16, True)),
+        ("reference catenary constants", lambda: [reference_catenary_constant(dist, 1.5) for dist in pole_dist.tolist()]),
+        ("catenary_constants batched", lambda: wire_geometry.catenary_constants(pole_dist, 1.5)),
+        ("sweep_tube batched 8 sides", lambda: wire_geometry.sweep_tube(paths, 0.05, 8)),
+        ("tube_data per span 8 sides", lambda: [wire_geometry.tube_data(path, 0.05, 8) for path in paths]),
+        ("reference ball 16 sides", lambda: [reference_ball(0.3, 16) for i in range(span_count)]),
+        ("ball_data 16 sides", lambda: [wire_geometry.ball_data(0.3, 16) for i in range(span_count)]),
+        ("ball_data icosphere 162 vertices", lambda: [wire_geometry.ball_data(0.3, 16, 162) for i in range(span_count)]),
+        ("spans_parts grouped with balls added (tube and 5 balls, as in network mesh)", lambda: [wire_geometry.add_balls(vertices, faces, centers, settings)
+            for vertices, edges, faces, centers in wire_geometry.spans_parts([(start, end, settings) for start, end in spans])]),
+        ("span_parts per span (edge wire)", lambda: [wire_geometry.span_parts(start, end, edge_settings) for start, end in spans]),
+        ("spans_parts grouped (edge wire)", lambda: wire_geometry.spans_parts([(start, end, edge_settings) for start, end in spans])),
+        ("span_parts per span (tube and 5 balls)", lambda: [wire_geometry.span_parts(start, end, settings) for start, end in spans]),
+        ("spans_parts grouped (tube and 5 balls)", lambda: wire_geometry.spans_parts([(start, end, settings) for start, end in spans])),
+    ]
+    results = []
+    for case, function in cases:
+        seconds = best_time(function, repeat)
+        results.append((case, seconds))
+        print(f"{span_count} spans, {case}: {seconds:.4f} s")
+    return results
+
+def main():
+    args = get_arguments()
+    parity = check_parity()
+    failed = [(check, difference) for check, difference in parity if not difference <= TOLERANCE]
+    for check, difference in failed:
+        print(f"does not match: {check} (largest difference {difference})")
+    print(f"{len(parity)-len(failed)} of {len(parity)} checks match")
+    timings = run_benchmarks(args.spans, args.repeat)
+    if args.output:
+        output = {
+            "numpy": np.__version__,
+            "spans": args.spans,
+            "repeat": args.repeat,
+            "parity": [{"check": check, "difference": difference} for check, difference in parity],
+            "results": [{"case": case, "seconds": seconds} for case, seconds in timings],
+        }
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+        print(f"wrote {len(timings)} results to {args.output}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
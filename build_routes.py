@@ -0,0 +1,41 @@
+import argparse
+import importlib
+import os
+import sys
+# bpy is only imported when blender runs this script, process pool workers (plain python)
+# import this script again as __mp_main__ and would fail on bpy
+if __name__ == "__main__":
+    import bpy
+
+# builds routes without opening blender window:
+# blender --background poles.blend --python build_routes.py -- routes.csv --output lines.blend
+# poles.blend has pole objects named like poles in routes file, wire config of its scene is used
+
+# arguments after "--" are for this script
+def get_arguments():
+    argv = sys.argv[sys.argv.index("--")+1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Place poles from csv or json routes file and draw wires between them")
+    parser.add_argument("routes", help="csv or json file with routes")
+    parser.add_argument("--output", help=".blend file to save (file that was opened is saved if not given)")
+    return parser.parse_args(argv)
+
+# imports plugin from directory of this file and registers it if it is not enabled
+def get_addon():
+    addon_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.dirname(addon_dir))
+    addon = importlib.import_module(os.path.basename(addon_dir))
+    if not hasattr(bpy.types.Scene, "wire_config"):
+        addon.register()
+    return addon
+
+def main():
+    args = get_arguments()
+    get_addon()
+    bpy.ops.wire_ops.build_routes(filepath=os.path.abspath(args.routes))
+    if args.output:
+        bpy.ops.wm.save_as_mainfile(filepath=os.path.abspath(args.output))
+    else:
+        bpy.ops.wm.save_mainfile()
+
+if __name__ == "__main__":
+    main()
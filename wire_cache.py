@@ -0,0 +1,104 @@
+import collections
+import math
+import numpy as np
+from . import wire_geometry
+
+# least recently used cache of span geometry (span_parts) in local frame of span
+# wire sags straight down, so its geometry only depends on horizontal length and height change of span (and settings),
+# turning span around z axis turns geometry with it. spans of same length are worked out once
+# lengths are rounded to precision, cached geometry is stretched to exact length so wires still end at mushrooms
+
+# key -> span_parts in local frame (span from origin along x axis), most recently used last
+entries = collections.OrderedDict()
+# bytes of arrays in cache, hits and misses since cache was cleared
+cache_state = {"bytes": 0, "hits": 0, "misses": 0}
+
+# gets settings that change span_parts (shading and curve settings do not)
+def parts_key(settings):
+    key = (wire_geometry.span_droop(settings), settings.segments, int(settings.catenary), settings.max_deviation, int(settings.thick))
+    if settings.thick:
+        key += (settings.radius, settings.sides)
+    if settings.balls_enabled:
+        key += (settings.ball_amount,)
+    return key
+
+# gets bytes used by arrays of span_parts
+def parts_bytes(parts):
+    vertices, edges, (loops, sizes), centers = parts
+    return vertices.nbytes + edges.nbytes + loops.nbytes + sizes.nbytes + centers.nbytes
+
+# deletes least recently used entries until cache is at most max_bytes
+def trim(max_bytes):
+    while entries and cache_state["bytes"] > max_bytes:
+        key, parts = entries.popitem(last=False)
+        cache_state["bytes"] -= parts_bytes(parts)
+
+def clear():
+    entries.clear()
+    cache_state["bytes"] = 0
+    cache_state["hits"] = 0
+    cache_state["misses"] = 0
+
+# gets horizontal length, height change and heading of span rounded to precision
+# returns (key, local end, transform) or None if span is (almost) vertical and can not be cached
+def span_frame(start, end, settings, precision):
+    dx, dy, dz = (e-s for s, e in zip(start, end))
+    length = math.hypot(dx, dy)
+    length_steps = round(length/precision)
+    height_steps = round(dz/precision)
+    if length_steps == 0:
+        return None
+    local_length = length_steps*precision
+    local_height = height_steps*precision
+    # stretches local span to exact length and height, then turns it to heading of span
+    cos_h = dx/length
+    sin_h = dy/length
+    stretch = np.array(((length/local_length, 0.0, 0.0), (0.0, 1.0, 0.0), ((dz-local_height)/local_length, 0.0, 1.0)))
+    turn = np.array(((cos_h, -sin_h, 0.0), (sin_h, cos_h, 0.0), (0.0, 0.0, 1.0)))
+    key = (length_steps, height_steps, precision, parts_key(settings))
+    return key, (local_length, 0.0, local_height), turn @ stretch
+
+# moves local span_parts to span starting at start with transform from span_frame
+def place_parts(parts, start, transform):
+    vertices, edges, faces, centers = parts
+    start = np.asarray(start, dtype=np.float64)
+    return vertices @ transform.T + start, edges, faces, centers @ transform.T + start
+
+# gets span_parts of every task (start, end, settings), worked out only for spans not in cache
+# compute gets list of tasks and returns their span_parts (like wire_pool.compute_spans)
+# precision is rounding of span lengths in meters, cache is kept under max_bytes
+def get_parts(tasks, compute, precision, max_bytes):
+    frames = [span_frame(start, end, settings, precision) for start, end, settings in tasks]
+    # spans missing from cache (and spans that can not be cached), each key worked out once
+    missing = {}
+    direct = []
+    for task, frame in zip(tasks, frames):
+        if frame is None:
+            direct.append(task)
+        elif frame[0] not in entries and frame[0] not in missing:
+            missing[frame[0]] = ((0.0, 0.0, 0.0), frame[1], task[2])
+    computed = compute(list(missing.values()) + direct)
+    for key, (vertices, edges, (loops, sizes), centers) in zip(missing, computed):
+        # own copies (not views into bigger arrays) so cache holds only memory it counts
+        # read only as they are shared by every span using them
+        arrays = [np.array(array) for array in (vertices, edges, loops, sizes, centers)]
+        for array in arrays:
+            array.flags.writeable = False
+        parts = (arrays[0], arrays[1], (arrays[2], arrays[3]), arrays[4])
+        entries[key] = parts
+        cache_state["bytes"] += parts_bytes(parts)
+    direct_parts = iter(computed[len(missing):])
+    # every cached span that was not worked out now is a hit
+    cache_state["hits"] += len(tasks) - len(direct) - len(missing)
+    cache_state["misses"] += len(missing)
+    results = []
+    for (start, end, settings), frame in zip(tasks, frames):
+        if frame is None:
+            results.append(next(direct_parts))
+            continue
+        key, local_end, transform = frame
+        entries.move_to_end(key)
+        results.append(place_parts(entries[key], start, transform))
+    # trimmed after spans are placed so spans of this call are not evicted before they are used
+    trim(max_bytes)
+    return results
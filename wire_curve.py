@@ -0,0 +1,66 @@
+import bpy
+import numpy as np
+from . import wire_geometry, wire_mesh
+
+# builds blender curves for wires
+# blender makes tube of curve from its bevel, so only points of curve are written from python
+
+# sets thickness (bevel) and shading of curve from settings
+def set_curve_settings(curve, settings):
+    curve.bevel_depth = settings.radius if settings.thick else 0.0
+    curve.bevel_resolution = wire_geometry.bevel_resolution(settings.sides)
+    curve.use_fill_caps = True
+    curve.resolution_u = settings.curve_resolution
+    for spline in curve.splines:
+        spline.use_smooth = settings.smooth
+
+# overwrites points of wire from start to end in curve
+# returns False without changing anything if curve has other spline type or amount of points
+def set_curve_points(curve, start, end, settings, constants=None):
+    if len(curve.splines) != 1 or curve.splines[0].type != settings.curve_type:
+        return False
+    spline = curve.splines[0]
+    if settings.curve_type == "BEZIER":
+        points, left, right = wire_geometry.bezier_points(start, end, settings, constants)
+        if len(spline.bezier_points) != len(points):
+            return False
+        spline.bezier_points.foreach_set("co", points.astype(np.float32).ravel())
+        spline.bezier_points.foreach_set("handle_left", left.astype(np.float32).ravel())
+        spline.bezier_points.foreach_set("handle_right", right.astype(np.float32).ravel())
+    else:
+        path = wire_geometry.wire_path(start, end, settings, constants)
+        if len(spline.points) != len(path):
+            return False
+        # poly points have weight as 4th coordinate
+        co = np.ones((len(path), 4), dtype=np.float32)
+        co[:, :3] = path
+        spline.points.foreach_set("co", co.ravel())
+    curve.update_tag()
+    return True
+
+# fills empty curve with one spline of wire from start to end
+def fill_curve(curve, start, end, settings, constants=None):
+    curve.dimensions = "3D"
+    spline = curve.splines.new(settings.curve_type)
+    if settings.curve_type == "BEZIER":
+        point_count = len(wire_geometry.bezier_points(start, end, settings, constants)[0])
+        spline.bezier_points.add(point_count-1)
+        # handles are worked out by bezier_points, blender should not move them
+        for point in spline.bezier_points:
+            point.handle_left_type = "FREE"
+            point.handle_right_type = "FREE"
+    else:
+        spline.points.add(len(wire_geometry.wire_path(start, end, settings, constants))-1)
+    set_curve_settings(curve, settings)
+    set_curve_points(curve, start, end, settings, constants)
+    return curve
+
+# makes new curve and object for wire from start to end and links it to current collection
+def new_curve_object(name, start, end, settings, constants=None):
+    curve = bpy.data.curves.new(name, type="CURVE")
+    # deleted with its object like meshes made by this addon
+    curve["wire_owned"] = True
+    fill_curve(curve, start, end, settings, constants)
+    obj = bpy.data.objects.new(name, curve)
+    wire_mesh.link_object(obj)
+    return obj
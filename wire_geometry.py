@@ -0,0 +1,551 @@
+import collections
+import functools
+import itertools
+import math
+import numpy as np
+
+# wire geometry that does not need blender (works on numpy arrays)
+# points are (x, y, z), spans are rows of start/end points
+
+# wire configuration values used to make geometry of span (copy of WireConfig that can be hashed)
+WireSettings = collections.namedtuple("WireSettings", [
+    "droop",
+    "segments",
+    "catenary",
+    "thick",
+    "radius",
+    "sides",
+    "smooth",
+    "balls_enabled",
+    "ball_radius",
+    "ball_sides",
+    "ball_amount",
+    # most distance in meters wire segments can be from curve (0 to split wire into segments equal parts)
+    "max_deviation",
+    # "" for mesh wire, or "POLY"/"BEZIER" to draw wire as curve object of that spline type
+    "curve_type",
+    # segments blender makes between two bezier points
+    "curve_resolution",
+    # most vertices of icosphere wire ball (0 for uv sphere with ball_sides sides)
+    "ball_budget",
+], defaults=(0.0, "", 4, 0))
+
+# curve types, index is saved in topology of wire
+CURVE_TYPES = ("", "POLY", "BEZIER")
+
+# log(sinh(x)) that does not overflow for large x
+def log_sinh(x):
+    big = x > 20
+    return np.where(big, x - math.log(2), np.log(np.sinh(np.where(big, 1.0, x))))
+
+# gets catenary equation constant for each span so that wire droops by droop at midpoint
+# solves a*(cosh(h/a) - 1) = droop (h is half of span) with newton's method on t = h/a
+# using log of equation so large droop/span ratios do not overflow
+def catenary_constants(pole_dist, droop, tol=1e-12, max_iterations=50):
+    half_dist = np.asarray(pole_dist, dtype=np.float64)/2
+    ratio = np.asarray(droop, dtype=np.float64)/half_dist
+    # starting guess from parabola for shallow wires and from exponential for deep wires
+    t = np.where(ratio < 1, 2*ratio, np.maximum(np.log(4*ratio), 1.0))
+    for i in range(max_iterations):
+        f = math.log(2) + 2*log_sinh(t/2) - np.log(t) - np.log(ratio)
+        df = 1/np.tanh(t/2) - 1/t
+        step = f/df
+        # do not let t go negative when step overshoots
+        t = np.maximum(t-step, t*0.1)
+        if np.all(np.abs(step) <= tol*t):
+            break
+    return half_dist/t
+
+# gets constant of sag equation for each span (computed once and reused for wire and balls)
+# parabola: z = c*x**2, catenary: z = c*cosh(x/c) - c
+# spans with no length or no droop get constant of 0 (straight wire)
+def span_constants(pole_dist, droop, catenary_enabled):
+    pole_dist = np.atleast_1d(np.asarray(pole_dist, dtype=np.float64))
+    droop = np.broadcast_to(np.asarray(droop, dtype=np.float64), pole_dist.shape)
+    sagging = (pole_dist > 0) & (droop > 0)
+    constants = np.zeros(pole_dist.shape)
+    if not sagging.any():
+        return constants
+    if catenary_enabled:
+        constants[sagging] = catenary_constants(pole_dist[sagging], droop[sagging])
+    else:
+        constants[sagging] = droop[sagging]/((pole_dist[sagging]**2)/4)
+    return constants
+
+# makes sure start and end points are (spans, 3) float arrays
+def as_span_points(starts, ends):
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 3)
+    ends = np.asarray(ends, dtype=np.float64).reshape(-1, 3)
+    return starts, ends
+
+# gets points on wires at fractions t of the way from start to end
+# t is (points,) for same fractions on every span or (spans, points) for fractions per span
+# droop is single value or one value per span
+# constants from span_constants can be given to not solve them again
+# returns (spans, points, 3) array
+def evaluate_spans(starts, ends, droop, t, catenary_enabled, constants=None):
+    starts, ends = as_span_points(starts, ends)
+    span_count = len(starts)
+    t = np.asarray(t, dtype=np.float64)
+    if t.ndim == 1:
+        t = np.broadcast_to(t, (span_count, len(t)))
+    droop = np.broadcast_to(np.asarray(droop, dtype=np.float64), (span_count,))
+    # get distance bewteen poles
+    pole_dist = np.linalg.norm(ends-starts, axis=1)
+    if constants is None:
+        constants = span_constants(pole_dist, droop, catenary_enabled)
+    # straight line between start and end points
+    points = starts[:, None, :] + (ends-starts)[:, None, :]*t[:, :, None]
+    # wires with no length or no droop stay straight
+    sagging = constants > 0
+    if not sagging.any():
+        return points
+    # x is distance from midpoint of wire (-pole_dist/2 at start, pole_dist/2 at end)
+    x = pole_dist[:, None]*(t-0.5)
+    c = np.where(sagging, constants, 1.0)[:, None]
+    if catenary_enabled:
+        # c*cosh(x/c) - c written with sinh to keep precision for shallow wires
+        sag = 2*c*(np.sinh(x/(2*c))**2)
+    else:
+        sag = c*(x**2)
+    # sag is droop at ends of wire and 0 at midpoint
+    points[:, :, 2] += np.where(sagging[:, None], sag-droop[:, None], 0.0)
+    return points
+
+# gets points on wires split into segments equal parts
+# returns (spans, segments+1, 3) array, first and last points are start and end points
+def sample_spans(starts, ends, droop, segments, catenary_enabled, constants=None):
+    starts, ends = as_span_points(starts, ends)
+    t = np.linspace(0.0, 1.0, segments+1)
+    points = evaluate_spans(starts, ends, droop, t, catenary_enabled, constants)
+    # wire should start and end exactly at mushrooms
+    points[:, 0] = starts
+    points[:, -1] = ends
+    return points
+
+# gets fractions t (0 at start, 1 at end) to sample wire at so no segment is further than max_deviation from curve
+# segment of length h is about h**2*z''/8 from curve, so points are spread with density sqrt(z''/(8*max_deviation))
+# (even for parabola, denser near ends for catenary), using at most max_segments segments
+def adaptive_t(pole_dist, constant, catenary_enabled, max_deviation, max_segments):
+    if constant <= 0 or pole_dist <= 0:
+        return np.array((0.0, 1.0))
+    # x is distance from midpoint of wire
+    x = np.linspace(-pole_dist/2, pole_dist/2, 257)
+    if catenary_enabled:
+        second_derivative = np.cosh(x/constant)/constant
+    else:
+        second_derivative = np.full(len(x), 2*constant)
+    density = np.sqrt(second_derivative/(8*max_deviation))
+    # segments needed from start to every x
+    needed = np.concatenate(((0.0,), np.cumsum((density[1:]+density[:-1])/2*np.diff(x))))
+    segments = int(min(max(math.ceil(needed[-1]), 1), max_segments))
+    x_samples = np.interp(np.linspace(0.0, needed[-1], segments+1), needed, x)
+    t = x_samples/pole_dist + 0.5
+    t[0] = 0.0
+    t[-1] = 1.0
+    return t
+
+# gets points on one wire (points, 3) split into segments equal parts
+# or, if max_deviation is more than 0, into as few segments (at most segments) as needed to stay within max_deviation of curve
+# (does not call sample_spans so stats do not time sampling twice)
+def sample_span(start, end, droop, segments, catenary_enabled, constants=None, max_deviation=0.0):
+    starts, ends = as_span_points(start, end)
+    if max_deviation <= 0:
+        t = np.linspace(0.0, 1.0, segments+1)
+    else:
+        pole_dist = float(np.linalg.norm(ends[0]-starts[0]))
+        if constants is None:
+            constants = span_constants(pole_dist, droop, catenary_enabled)
+        t = adaptive_t(pole_dist, float(constants[0]), catenary_enabled, max_deviation, segments)
+    points = evaluate_spans(starts, ends, droop, t, catenary_enabled, constants)[0]
+    # wire should start and end exactly at mushrooms
+    points[0] = starts[0]
+    points[-1] = ends[0]
+    return points
+
+# makes edges connecting points of path one after another
+def path_edges(point_count):
+    idx = np.arange(point_count-1)
+    return np.stack((idx, idx+1), axis=1)
+
+# gets cos and sin of angle for every side of ring around wire (same for every ring)
+@functools.lru_cache(maxsize=32)
+def ring_template(sides):
+    angles = np.arange(sides)*((2*math.pi)/sides)
+    template = np.stack((np.cos(angles), np.sin(angles)), axis=1)
+    template.flags.writeable = False
+    return template
+
+# normalizes vectors along last axis, vectors with no length are left as 0
+def normalized(vectors):
+    length = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, length, out=np.zeros_like(vectors), where=length > 1e-12)
+
+# gets tangent, normal and binormal for every point of paths (spans, points, 3)
+# tangents halve angle between segments, normals are carried along path with parallel transport
+# (double reflection) so rings do not twist
+def path_frames(paths):
+    paths = np.asarray(paths, dtype=np.float64)
+    segments = normalized(np.diff(paths, axis=1))
+    tangents = np.empty_like(paths)
+    tangents[:, 0] = segments[:, 0]
+    tangents[:, -1] = segments[:, -1]
+    tangents[:, 1:-1] = segments[:, :-1] + segments[:, 1:]
+    tangents = normalized(tangents)
+    # first normal is horizontal and perpendicular to wire (wire straight up uses x axis)
+    normals = np.empty_like(paths)
+    first = np.stack((-tangents[:, 0, 1], tangents[:, 0, 0], np.zeros(len(paths))), axis=1)
+    vertical = np.linalg.norm(first, axis=1) < 1e-12
+    first[vertical] = (1.0, 0.0, 0.0)
+    normals[:, 0] = normalized(first)
+    for i in range(paths.shape[1]-1):
+        # reflect normal and tangent in plane between points
+        v1 = paths[:, i+1] - paths[:, i]
+        c1 = np.einsum("ij,ij->i", v1, v1)[:, None]
+        c1 = np.where(c1 > 1e-24, c1, np.inf)
+        normal_l = normals[:, i] - (2/c1)*np.einsum("ij,ij->i", v1, normals[:, i])[:, None]*v1
+        tangent_l = tangents[:, i] - (2/c1)*np.einsum("ij,ij->i", v1, tangents[:, i])[:, None]*v1
+        # reflect again so tangent lines up with next tangent
+        v2 = tangents[:, i+1] - tangent_l
+        c2 = np.einsum("ij,ij->i", v2, v2)[:, None]
+        c2 = np.where(c2 > 1e-24, c2, np.inf)
+        normals[:, i+1] = normal_l - (2/c2)*np.einsum("ij,ij->i", v2, normal_l)[:, None]*v2
+    binormals = np.cross(tangents, normals)
+    return tangents, normals, binormals
+
+# sweeps ring of sides vertices along paths (spans, points, 3)
+# returns (spans, points*sides, 3) array, vertices go ring by ring counter clockwise around wire
+def sweep_tube(paths, radius, sides):
+    paths = np.asarray(paths, dtype=np.float64)
+    template = ring_template(sides)
+    tangents, normals, binormals = path_frames(paths)
+    rings = (paths[:, :, None, :]
+             + radius*template[None, None, :, 0, None]*normals[:, :, None, :]
+             + radius*template[None, None, :, 1, None]*binormals[:, :, None, :])
+    return rings.reshape(len(paths), -1, 3)
+
+# gets faces of tube with point_count rings of sides vertices (same for every span)
+# returns (quads, caps), quads is ((point_count-1)*sides, 4) array, caps is (2, sides) array
+@functools.lru_cache(maxsize=32)
+def tube_faces(point_count, sides):
+    ring_start = (np.arange(point_count-1)*sides)[:, None]
+    j = np.arange(sides)[None, :]
+    prev_j = (j-1) % sides
+    quads = np.stack((ring_start+j, ring_start+sides+j, ring_start+sides+prev_j, ring_start+prev_j), axis=2).reshape(-1, 4)
+    # start cap is reversed so it faces out of wire
+    caps = np.stack((np.arange(sides)[::-1], np.arange(sides) + (point_count-1)*sides))
+    quads.flags.writeable = False
+    caps.flags.writeable = False
+    return quads, caps
+
+# gets amount of vertical segments of uv sphere ball with sides around it (segments about as tall as wide)
+def ball_rings(sides):
+    return max(sides//2, 2)
+
+# gets vertices and packed faces of uv sphere with radius 1 and sides around it, centered at origin
+# bottom vertex is first, then rings of sides vertices from bottom to top, top vertex is last
+# not using blender primitive sphere as they cause issues with auto updating
+@functools.lru_cache(maxsize=32)
+def unit_uv_ball(sides):
+    # less than 3 sides has no volume
+    sides = max(sides, 3)
+    rings = ball_rings(sides)
+    # angle (phi) of every ring from -90 degrees (bottom) to 90 degrees (top), poles are single vertices
+    v_angles = -math.pi/2 + np.arange(1, rings)*(math.pi/rings)
+    # angle (theta) of every vertex around ring
+    h_angles = np.arange(sides)*((2*math.pi)/sides)
+    vertices = np.empty((len(v_angles)*sides + 2, 3))
+    vertices[0] = (0.0, 0.0, -1.0)
+    vertices[-1] = (0.0, 0.0, 1.0)
+    vertices[1:-1, 0] = (np.cos(v_angles)[:, None]*np.cos(h_angles)[None, :]).ravel()
+    vertices[1:-1, 1] = (np.cos(v_angles)[:, None]*np.sin(h_angles)[None, :]).ravel()
+    vertices[1:-1, 2] = np.repeat(np.sin(v_angles), sides)
+    # first vertex of every ring and next vertex around ring
+    ring_start = 1 + np.arange(len(v_angles))[:, None]*sides
+    j = np.arange(sides)[None, :]
+    next_j = (j+1) % sides
+    top = len(vertices)-1
+    bottom_faces = np.stack((1+next_j[0], 1+j[0], np.zeros(sides, dtype=np.int64)), axis=1)
+    middle_faces = np.stack((ring_start[1:]+j, ring_start[:-1]+j, ring_start[:-1]+next_j, ring_start[1:]+next_j), axis=2).reshape(-1, 4)
+    top_faces = np.stack((np.full(sides, top), ring_start[-1]+j[0], ring_start[-1]+next_j[0]), axis=1)
+    faces = join_faces(pack_faces(bottom_faces), pack_faces(middle_faces), pack_faces(top_faces))
+    return read_only(vertices, faces)
+
+# gets subdivision level of icosphere with most vertices within budget (level has 10*4**level+2 vertices)
+def ico_level(budget):
+    level = 0
+    while 10*4**(level+1) + 2 <= budget:
+        level += 1
+    return level
+
+# gets vertices and packed faces of icosphere with radius 1 subdivided level times, centered at origin
+# vertices are spread evenly over ball, so it looks round with fewer vertices than uv sphere
+@functools.lru_cache(maxsize=16)
+def unit_ico_ball(level):
+    t = (1 + math.sqrt(5))/2
+    vertices = normalized(np.array((
+        (-1, t, 0), (1, t, 0), (-1, -t, 0), (1, -t, 0),
+        (0, -1, t), (0, 1, t), (0, -1, -t), (0, 1, -t),
+        (t, 0, -1), (t, 0, 1), (-t, 0, -1), (-t, 0, 1),
+    ), dtype=np.float64))
+    faces = np.array((
+        (0, 11, 5), (0, 5, 1), (0, 1, 7), (0, 7, 10), (0, 10, 11),
+        (1, 5, 9), (5, 11, 4), (11, 10, 2), (10, 7, 6), (7, 1, 8),
+        (3, 9, 4), (3, 4, 2), (3, 2, 6), (3, 6, 8), (3, 8, 9),
+        (4, 9, 5), (2, 4, 11), (6, 2, 10), (8, 6, 7), (9, 8, 1),
+    ))
+    for i in range(level):
+        # new vertex in middle of every edge (once for edge shared by two faces), moved out onto ball
+        edges = np.sort(np.stack((faces, np.roll(faces, -1, axis=1)), axis=2).reshape(-1, 2), axis=1)
+        unique_edges, edge_index = np.unique(edges, axis=0, return_inverse=True)
+        middles = edge_index.reshape(-1, 3) + len(vertices)
+        vertices = np.concatenate((vertices, normalized(vertices[unique_edges[:, 0]] + vertices[unique_edges[:, 1]])))
+        # every face is split into 4 faces
+        a, b, c = faces.T
+        ab, bc, ca = middles.T
+        faces = np.stack((
+            np.stack((a, ab, ca), axis=1),
+            np.stack((ab, b, bc), axis=1),
+            np.stack((ca, bc, c), axis=1),
+            np.stack((ab, bc, ca), axis=1),
+        ), axis=1).reshape(-1, 3)
+    return read_only(vertices, pack_faces(faces))
+
+# makes vertices and packed faces read only (shared by every ball using them) and returns them
+def read_only(vertices, faces):
+    for array in (vertices, faces[0], faces[1]):
+        array.flags.writeable = False
+    return vertices, faces
+
+# gets vertices and packed faces of ball with radius centered at origin
+# uv sphere with sides around it, or icosphere with most vertices within ico_budget if ico_budget is more than 0
+def ball_data(radius, sides, ico_budget=0):
+    if ico_budget > 0:
+        vertices, faces = unit_ico_ball(ico_level(ico_budget))
+    else:
+        vertices, faces = unit_uv_ball(sides)
+    # template is only scaled, faces are shared
+    return vertices*radius, faces
+
+# gets vertices and packed faces of tube with radius and sides following path (points, 3)
+def tube_data(path, radius, sides):
+    # rings around every point of path
+    vertices = sweep_tube(path[None], radius, sides)[0]
+    # quads between rings and start and end faces
+    quads, caps = tube_faces(len(path), sides)
+    faces = join_faces(pack_faces(quads), pack_faces(caps))
+    return vertices, faces
+
+# gets droop actually used for span, wires with no droop or one segment are straight
+def span_droop(settings):
+    if (settings.droop == 0) or (settings.segments == 1):
+        return 0.0
+    return settings.droop
+
+# camera used for level of detail
+# pixels_per_meter is how many pixels 1 meter covers 1 meter away from camera (at any distance if orthographic)
+LodCamera = collections.namedtuple("LodCamera", ["location", "pixels_per_meter", "orthographic"])
+
+# gets about how many pixels long wire from start to end is from camera
+def projected_size(start, end, camera):
+    length = math.dist(start, end)
+    if camera.orthographic:
+        return length*camera.pixels_per_meter
+    midpoint = [(a+b)/2 for a, b in zip(start, end)]
+    distance = max(math.dist(midpoint, camera.location), 1e-6)
+    return length*camera.pixels_per_meter/distance
+
+# gets settings with segments, sides and ball sides scaled down for wire that looks small from camera
+# wires at least full_pixels long keep settings, smaller wires get settings halved once for every halving of size
+# (snapping to halves so wires do not change detail on every small camera move)
+# minimums is (segments, sides, ball sides) settings are never scaled below
+def lod_settings(settings, start, end, camera, full_pixels, minimums):
+    factor = projected_size(start, end, camera)/full_pixels
+    if factor >= 1:
+        return settings
+    factor = 2.0**math.floor(math.log2(max(factor, 2.0**-20)))
+    min_segments, min_sides, min_ball_sides = minimums
+    def scale(value, minimum):
+        return max(min(value, minimum), round(value*factor))
+    return settings._replace(
+        segments=scale(settings.segments, min_segments),
+        sides=scale(settings.sides, min_sides),
+        ball_sides=scale(settings.ball_sides, min_ball_sides),
+        # icosphere balls keep at least 12 vertices (icosahedron)
+        ball_budget=scale(settings.ball_budget, 12),
+    )
+
+# gets values that change how many vertices, edges and faces wire_data makes (or how they are shaded)
+# wires with same wire topology key can have their vertices rewritten in place
+# adaptive wires (segments 0 in key) can have different vertex count for every span, so vertex count is checked too
+def wire_topology_key(settings):
+    if span_droop(settings) == 0:
+        segments = 1
+    elif settings.max_deviation > 0:
+        segments = 0
+    else:
+        segments = settings.segments
+    key = (segments, int(settings.thick))
+    if settings.thick:
+        key += (settings.sides, int(settings.smooth))
+    # curve wires have other points than mesh wires (bezier has one point for every curve_resolution segments)
+    if settings.curve_type:
+        key += (CURVE_TYPES.index(settings.curve_type), settings.curve_resolution)
+    return key
+
+# same as wire_topology_key but for wire and balls in one mesh (network mesh)
+def topology_key(settings):
+    key = wire_topology_key(settings)
+    if settings.balls_enabled:
+        key += (settings.ball_sides, settings.ball_budget, settings.ball_amount, int(settings.smooth))
+    return key
+
+# gets points of wire from start to end (straight, segments equal parts or adaptive)
+def wire_path(start, end, settings, constants=None):
+    droop = span_droop(settings)
+    if droop == 0:
+        return np.array((start, end), dtype=np.float64)
+    return sample_span(start, end, droop, settings.segments, settings.catenary, constants, settings.max_deviation)
+
+# gets bezier points (and left and right handles) of wire from start to end
+# one bezier segment for every curve_resolution wire segments, handles follow slope of wire
+# so bezier segment bends like wire (parabola is drawn exactly)
+def bezier_points(start, end, settings, constants=None):
+    droop = span_droop(settings)
+    starts, ends = as_span_points(start, end)
+    pole_dist = float(np.linalg.norm(ends[0]-starts[0]))
+    if constants is None:
+        constants = span_constants(pole_dist, droop, settings.catenary)
+    if droop == 0:
+        t = np.array((0.0, 1.0))
+    elif settings.max_deviation > 0:
+        t = adaptive_t(pole_dist, float(constants[0]), settings.catenary, settings.max_deviation, settings.segments)
+    else:
+        t = np.linspace(0.0, 1.0, -(-settings.segments//settings.curve_resolution)+1)
+    points = evaluate_spans(starts, ends, droop, t, settings.catenary, constants)[0]
+    points[0] = starts[0]
+    points[-1] = ends[0]
+    # slope of wire (change of point for change of t)
+    step = 1e-6
+    slopes = (evaluate_spans(starts, ends, droop, t+step, settings.catenary, constants)[0]
+              - evaluate_spans(starts, ends, droop, t-step, settings.catenary, constants)[0])/(2*step)
+    gaps = np.diff(t)
+    before = np.concatenate((gaps[:1], gaps))[:, None]/3
+    after = np.concatenate((gaps, gaps[-1:]))[:, None]/3
+    return points, points-slopes*before, points+slopes*after
+
+# gets curve bevel resolution giving about sides sides (bevel makes 4 sides, 2 more for each resolution)
+def bevel_resolution(sides):
+    return max((sides-3)//2, 0)
+
+# gets vertices, edges and packed faces of wire (no balls) for one span from start to end
+def wire_data(start, end, settings, constants=None):
+    droop = span_droop(settings)
+    if constants is None:
+        constants = span_constants(math.dist(start, end), droop, settings.catenary)
+    path = wire_path(start, end, settings, constants)
+    if settings.thick:
+        vertices, faces = tube_data(path, settings.radius, settings.sides)
+        edges = np.zeros((0, 2), dtype=np.int32)
+    else:
+        vertices = path
+        edges = path_edges(len(path))
+        faces = (np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32))
+    return vertices, edges, faces
+
+# gets vertices, edges and packed faces of wire and centers of balls for one span from start to end
+# (centers is (0, 3) array if balls are not enabled)
+def span_parts(start, end, settings):
+    droop = span_droop(settings)
+    constants = span_constants(math.dist(start, end), droop, settings.catenary)
+    vertices, edges, faces = wire_data(start, end, settings, constants)
+    if settings.balls_enabled:
+        centers = ball_positions(start, end, droop, settings.ball_amount, settings.catenary, constants)
+    else:
+        centers = np.zeros((0, 3))
+    return vertices, edges, faces, centers
+
+# gets span_parts of spans (starts, ends) that all have same settings, worked out together
+# arrays of every span are views into arrays of all spans, edges and faces are shared by all spans
+def group_parts(starts, ends, settings):
+    droop = span_droop(settings)
+    # adaptive wires can have other amount of points for every span, so they are worked out one by one
+    if droop != 0 and settings.max_deviation > 0:
+        return [span_parts(start, end, settings) for start, end in zip(starts.tolist(), ends.tolist())]
+    constants = span_constants(np.linalg.norm(ends-starts, axis=1), droop, settings.catenary)
+    if droop == 0:
+        paths = np.stack((starts, ends), axis=1)
+    else:
+        paths = sample_spans(starts, ends, droop, settings.segments, settings.catenary, constants)
+    if settings.thick:
+        vertices = sweep_tube(paths, settings.radius, settings.sides)
+        quads, caps = tube_faces(paths.shape[1], settings.sides)
+        faces = join_faces(pack_faces(quads), pack_faces(caps))
+        edges = np.zeros((0, 2), dtype=np.int32)
+    else:
+        vertices = paths
+        edges = path_edges(paths.shape[1])
+        faces = (np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32))
+    for array in (edges, faces[0], faces[1]):
+        array.flags.writeable = False
+    if settings.balls_enabled:
+        centers = ball_centers(starts, ends, droop, settings.ball_amount, settings.catenary, constants)
+    else:
+        centers = np.zeros((len(starts), 0, 3))
+    return [(vertices[i], edges, faces, centers[i]) for i in range(len(starts))]
+
+# gets span_parts of every task (start, end, settings)
+# spans with same settings are sampled (and swept into tubes) together instead of one by one
+def spans_parts(tasks):
+    groups = {}
+    for index, (start, end, settings) in enumerate(tasks):
+        groups.setdefault(settings, []).append(index)
+    parts = [None]*len(tasks)
+    for settings, indices in groups.items():
+        starts, ends = as_span_points([tasks[i][0] for i in indices], [tasks[i][1] for i in indices])
+        for index, span in zip(indices, group_parts(starts, ends, settings)):
+            parts[index] = span
+    return parts
+
+# adds copy of ball at every center to vertices and packed faces of wire
+def add_balls(vertices, faces, centers, settings):
+    ball_vertices, ball_faces = ball_template_data(settings.ball_radius, settings.ball_sides, settings.ball_budget)
+    # faces of every ball moved along by vertices before them
+    balls = (ball_vertices[None, :, :] + centers[:, None, :]).reshape(-1, 3)
+    offsets = len(vertices) + np.arange(len(centers))*len(ball_vertices)
+    ball_loops = (ball_faces[0][None, :] + offsets[:, None]).ravel()
+    ball_sizes = np.tile(ball_faces[1], len(centers))
+    return np.concatenate((vertices, balls)), join_faces(faces, (ball_loops, ball_sizes))
+
+# gets coordinates of amount balls splitting every wire into amount+1 equal parts, (spans, amount, 3) array
+def ball_centers(starts, ends, droop, amount, catenary_enabled, constants=None):
+    t = np.arange(1, amount+1)/(amount+1)
+    return evaluate_spans(starts, ends, droop, t, catenary_enabled, constants)
+
+# gets coordinates of amount balls splitting wire into amount+1 equal parts
+def ball_positions(start, end, droop, amount, catenary_enabled, constants=None):
+    return ball_centers(start, end, droop, amount, catenary_enabled, constants)[0]
+
+# gets ball vertices and packed faces centered at origin (same for every ball with radius, sides and ico_budget)
+@functools.lru_cache(maxsize=32)
+def ball_template_data(radius, sides, ico_budget=0):
+    vertices, faces = ball_data(radius, sides, ico_budget)
+    vertices.flags.writeable = False
+    return vertices, faces
+
+# packs faces into flat vertex indices (one per loop) and face sizes for building meshes
+# faces is (faces, n) array when all faces have same size, or list of faces of any size
+def pack_faces(faces):
+    if isinstance(faces, np.ndarray):
+        loops = faces.astype(np.int32).ravel()
+        sizes = np.full(len(faces), faces.shape[1], dtype=np.int32)
+    else:
+        sizes = np.fromiter((len(face) for face in faces), dtype=np.int32, count=len(faces))
+        loops = np.fromiter(itertools.chain.from_iterable(faces), dtype=np.int32, count=int(sizes.sum()))
+    return loops, sizes
+
+# joins packed faces (loops, sizes) into one
+def join_faces(*packed):
+    loops = np.concatenate([p[0] for p in packed])
+    sizes = np.concatenate([p[1] for p in packed])
+    return loops, sizes
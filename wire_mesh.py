@@ -0,0 +1,112 @@
+import bpy
+import numpy as np
+from . import wire_geometry
+
+# builds blender meshes from flat vertex and index buffers
+# (faster than from_pydata with lists of tuples and looping over polygons)
+
+# fills empty mesh with vertices (n, 3), edges (n, 2) and packed faces (loops, sizes) from wire_geometry.pack_faces
+def fill_mesh(mesh, vertices, edges=None, faces=None, shade_smooth=False):
+    vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+    mesh.vertices.add(len(vertices))
+    mesh.vertices.foreach_set("co", vertices.ravel())
+    if edges is not None and len(edges):
+        edges = np.asarray(edges, dtype=np.int32).reshape(-1, 2)
+        mesh.edges.add(len(edges))
+        mesh.edges.foreach_set("vertices", edges.ravel())
+    if faces is not None and len(faces[1]):
+        loops, sizes = faces
+        loops = np.asarray(loops, dtype=np.int32)
+        sizes = np.asarray(sizes, dtype=np.int32)
+        # first loop of every face
+        loop_starts = np.zeros(len(sizes), dtype=np.int32)
+        np.cumsum(sizes[:-1], out=loop_starts[1:])
+        mesh.loops.add(len(loops))
+        mesh.loops.foreach_set("vertex_index", loops)
+        mesh.polygons.add(len(sizes))
+        mesh.polygons.foreach_set("loop_start", loop_starts)
+        # loop_total is read only (worked out from loop_start) since blender 4.0
+        if bpy.app.version < (4, 0, 0):
+            mesh.polygons.foreach_set("loop_total", sizes)
+        if shade_smooth:
+            mesh.polygons.foreach_set("use_smooth", np.ones(len(sizes), dtype=bool))
+        # faces need edges made for them
+        mesh.update(calc_edges=True)
+    else:
+        mesh.update()
+    return mesh
+
+# overwrites coordinates of all vertices of mesh (vertices must be same amount as mesh has)
+def set_vertices(mesh, vertices):
+    mesh.vertices.foreach_set("co", np.asarray(vertices, dtype=np.float32).ravel())
+    mesh.update()
+
+# gets collection new wire objects are linked to
+# (current collection, or scene collection when there is none like in timers)
+def get_collection():
+    collection = bpy.context.collection
+    if collection is None:
+        collection = bpy.context.scene.collection
+    return collection
+
+# links new wire object to collection wires are drawn in
+def link_object(obj):
+    get_collection().objects.link(obj)
+
+# makes new mesh marked as made by this addon (only marked meshes are deleted with their objects)
+def new_mesh(name):
+    mesh = bpy.data.meshes.new(name)
+    mesh["wire_owned"] = True
+    return mesh
+
+# deletes objects and meshes (or curves) made by this addon that no other object uses
+def remove_objects(objects):
+    owned_data = {}
+    for obj in objects:
+        # object already deleted
+        if obj is None:
+            continue
+        data = obj.data
+        if data is not None and data.get("wire_owned", False):
+            owned_data[(obj.type, data.name)] = data
+        bpy.data.objects.remove(obj)
+    for (obj_type, name), data in owned_data.items():
+        if data.users == 0:
+            if obj_type == "CURVE":
+                bpy.data.curves.remove(data)
+            else:
+                bpy.data.meshes.remove(data)
+
+# deletes meshes made by this addon that no object uses anymore
+def remove_unused_meshes(meshes):
+    for mesh in meshes:
+        if mesh.get("wire_owned", False) and mesh.users == 0:
+            bpy.data.meshes.remove(mesh)
+
+# makes new mesh and object with name and links it to current collection
+def new_mesh_object(name, vertices, edges=None, faces=None, shade_smooth=False):
+    mesh = new_mesh(name)
+    fill_mesh(mesh, vertices, edges, faces, shade_smooth)
+    obj = bpy.data.objects.new(name, mesh)
+    link_object(obj)
+    return obj
+
+# gets name of mesh shared by all balls with radius and sides (or ico_budget)
+def ball_mesh_name(radius, sides, ico_budget=0):
+    if ico_budget > 0:
+        return f"wire_ball_r{radius:.6g}_ico{wire_geometry.ico_level(ico_budget)}"
+    return f"wire_ball_r{radius:.6g}_uv{sides}"
+
+# gets mesh shared by all balls with radius and sides (or ico_budget), makes it if it does not exist yet
+# looked up by name every time as mesh references do not survive undo
+def get_ball_mesh(radius, sides, ico_budget=0):
+    name = ball_mesh_name(radius, sides, ico_budget)
+    ball_mesh = bpy.data.meshes.get(name)
+    # make sure mesh with this name was made by this addon
+    if ball_mesh is not None and ball_mesh.get("wire_ball", False):
+        return ball_mesh
+    vertices, faces = wire_geometry.ball_data(radius, sides, ico_budget)
+    ball_mesh = new_mesh(name)
+    fill_mesh(ball_mesh, vertices, faces=faces, shade_smooth=True)
+    ball_mesh["wire_ball"] = True
+    return ball_mesh
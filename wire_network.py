@@ -0,0 +1,120 @@
+import bpy
+import itertools
+import numpy as np
+from . import wire_geometry, wire_mesh
+
+# network mesh draws all wires between a run of poles into one mesh object
+# vertices of each span are kept together and "span_id" point attribute tells which span they belong to
+# network object keeps poles, mushroom index and first vertex of every span so moving a pole only rewrites its spans
+
+# coordinates last written to every network mesh: network object name -> (mesh pointer, version, (vertices, 3) float32 array)
+# so moving a pole only changes slices of its spans in memory instead of reading all vertices back from blender
+# mesh keeps version of coordinates it has ("wire_co_version"), undo brings back older version and coordinates are read again
+co_cache = {}
+co_versions = itertools.count(1)
+
+# saves co as coordinates of network mesh
+def set_cached_co(net_obj, co):
+    version = next(co_versions)
+    net_obj.data["wire_co_version"] = version
+    co_cache[net_obj.name] = (net_obj.data.as_pointer(), version, co)
+
+# gets coordinates of network mesh (from cache if mesh still has them, read from mesh if not)
+def get_co(net_obj):
+    mesh = net_obj.data
+    cached = co_cache.get(net_obj.name, None)
+    if cached is not None:
+        pointer, version, co = cached
+        if pointer == mesh.as_pointer() and version == mesh.get("wire_co_version", None) and len(co) == len(mesh.vertices):
+            return co
+    co = np.empty(len(mesh.vertices)*3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    return co.reshape(-1, 3)
+
+def clear_co_cache():
+    co_cache.clear()
+
+# gets vertices, edges, faces, span ids and first vertex of every span for spans (start, end) with settings
+# parts can be span_parts of spans already worked out (together with other wires)
+def get_network_data(span_points, settings, parts=None):
+    if parts is None:
+        parts = wire_geometry.spans_parts([(start, end, settings) for start, end in span_points])
+    vertices = []
+    edges = []
+    faces = []
+    offsets = [0]
+    for span_vertices, span_edges, span_faces, centers in parts:
+        if settings.balls_enabled:
+            span_vertices, span_faces = wire_geometry.add_balls(span_vertices, span_faces, centers, settings)
+        span_loops, span_sizes = span_faces
+        # indices of span are moved along by vertices of spans before it
+        vertices.append(span_vertices)
+        edges.append(span_edges + offsets[-1])
+        faces.append((span_loops + offsets[-1], span_sizes))
+        offsets.append(offsets[-1] + len(span_vertices))
+    if not vertices:
+        return np.zeros((0, 3)), np.zeros((0, 2), dtype=np.int32), (np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)), np.zeros(0, dtype=np.int32), offsets
+    span_ids = np.repeat(np.arange(len(span_points), dtype=np.int32), np.diff(offsets))
+    return np.concatenate(vertices), np.concatenate(edges), wire_geometry.join_faces(*faces), span_ids, offsets
+
+# fills network mesh with spans and saves span table to network object
+# spans is list of (start_obj, end_obj, mushroom_index), span_points is list of (start, end) coordinates for each span
+# all faces are shaded smooth if settings.smooth (balls included)
+def fill_network(net_obj, spans, span_points, settings, parts=None):
+    mesh = net_obj.data
+    mesh.clear_geometry()
+    vertices, edges, faces, span_ids, offsets = get_network_data(span_points, settings, parts)
+    wire_mesh.fill_mesh(mesh, vertices, edges, faces, settings.smooth)
+    set_cached_co(net_obj, np.asarray(vertices, dtype=np.float32).reshape(-1, 3))
+    span_attribute = mesh.attributes.get("span_id")
+    if span_attribute is None:
+        span_attribute = mesh.attributes.new("span_id", "INT", "POINT")
+    span_attribute.data.foreach_set("value", span_ids)
+    # span table
+    net_obj["span_starts"] = [span[0] for span in spans]
+    net_obj["span_ends"] = [span[1] for span in spans]
+    net_obj["span_mushrooms"] = [span[2] for span in spans]
+    net_obj["span_offsets"] = offsets
+    net_obj["topology"] = list(wire_geometry.topology_key(settings))
+
+# makes network mesh object with name for spans
+def build_network(name, spans, span_points, settings, parts=None):
+    net_obj = bpy.data.objects.new(name, wire_mesh.new_mesh(name))
+    wire_mesh.link_object(net_obj)
+    net_obj["wire_network"] = True
+    fill_network(net_obj, spans, span_points, settings, parts)
+    return net_obj
+
+# gets spans of network as (start_obj, end_obj, mushroom_index)
+def get_spans(net_obj):
+    return list(zip(net_obj["span_starts"], net_obj["span_ends"], net_obj["span_mushrooms"]))
+
+# rewrites vertices of spans at span_indices with new span_points (start, end) in place
+# returns False without changing anything if settings or new points make different amount of vertices (network needs fill_network)
+def update_spans(net_obj, span_indices, span_points, settings, parts=None):
+    if list(net_obj.get("topology", [])) != list(wire_geometry.topology_key(settings)):
+        return False
+    mesh = net_obj.data
+    offsets = net_obj["span_offsets"]
+    # foreach_set can not write part of vertices so all are written (O(network vertices)),
+    # but coordinates are kept in memory and only slices of changed spans are computed
+    co = get_co(net_obj)
+    if parts is None:
+        parts = wire_geometry.spans_parts([(start, end, settings) for start, end in span_points])
+    for span_index, (span_vertices, span_edges, span_faces, centers) in zip(span_indices, parts):
+        if settings.balls_enabled:
+            span_vertices = wire_geometry.add_balls(span_vertices, span_faces, centers, settings)[0]
+        # adaptive wires can need other amount of vertices after moving
+        if len(span_vertices) != offsets[span_index+1] - offsets[span_index]:
+            # spans before it were already changed in cached coordinates
+            co_cache.pop(net_obj.name, None)
+            return False
+        co[offsets[span_index]:offsets[span_index+1]] = span_vertices
+    wire_mesh.set_vertices(mesh, co)
+    set_cached_co(net_obj, co)
+    return True
+
+# deletes network object and its mesh
+def remove_network(net_obj):
+    co_cache.pop(net_obj.name, None)
+    wire_mesh.remove_objects([net_obj])
@@ -0,0 +1,264 @@
+import bpy
+import math
+from . import wire_geometry, wire_mesh
+
+# procedural network draws wires between a run of poles with geometry nodes
+# network mesh only has start and end point of every span (one edge per span) and hook modifiers move them with poles,
+# geometry nodes modifier makes wire and balls from the edges so python only runs when spans or settings change
+
+NODE_GROUP_NAME = "wire_procedural"
+# changed when node group changes so node groups saved in old .blend files are made again
+NODE_GROUP_VERSION = 2
+# newton iterations for catenary constant (enough for float precision of nodes)
+CATENARY_ITERATIONS = 8
+# catenary flatter than this droop/half span ratio is drawn as parabola (float precision of nodes is not enough for it)
+CATENARY_MIN_RATIO = 0.01
+
+# inputs of node group (name, socket type)
+GROUP_INPUTS = (
+    ("Droop", "NodeSocketFloat"),
+    ("Segments", "NodeSocketInt"),
+    ("Catenary", "NodeSocketBool"),
+    ("Thick", "NodeSocketBool"),
+    ("Radius", "NodeSocketFloat"),
+    ("Sides", "NodeSocketInt"),
+    ("Smooth", "NodeSocketBool"),
+    ("Balls", "NodeSocketBool"),
+    ("Ball Radius", "NodeSocketFloat"),
+    ("Ball Sides", "NodeSocketInt"),
+    ("Ball Rings", "NodeSocketInt"),
+    ("Ico Ball", "NodeSocketBool"),
+    ("Ico Subdivisions", "NodeSocketInt"),
+    ("Ball Amount", "NodeSocketInt"),
+)
+
+# gets values of node group inputs for settings
+def get_input_values(settings):
+    return {
+        "Droop": float(wire_geometry.span_droop(settings)),
+        "Segments": int(settings.segments),
+        "Catenary": bool(settings.catenary),
+        "Thick": bool(settings.thick),
+        "Radius": float(settings.radius),
+        "Sides": int(settings.sides),
+        "Smooth": bool(settings.smooth),
+        "Balls": bool(settings.balls_enabled),
+        "Ball Radius": float(settings.ball_radius),
+        "Ball Sides": max(int(settings.ball_sides), 3),
+        # same rings and subdivisions as balls of wire_geometry (icosphere node subdivision 1 is icosahedron)
+        "Ball Rings": wire_geometry.ball_rings(max(int(settings.ball_sides), 3)),
+        "Ico Ball": settings.ball_budget > 0,
+        "Ico Subdivisions": wire_geometry.ico_level(settings.ball_budget) + 1,
+        "Ball Amount": int(settings.ball_amount),
+    }
+
+# node group interface changed in blender 4.0
+def new_group_socket(group, name, socket_type, in_out):
+    if bpy.app.version >= (4, 0, 0):
+        return group.interface.new_socket(name, in_out=in_out, socket_type=socket_type)
+    sockets = group.inputs if in_out == "INPUT" else group.outputs
+    return sockets.new(socket_type, name)
+
+def get_group_inputs(group):
+    if bpy.app.version >= (4, 0, 0):
+        return [item for item in group.interface.items_tree if item.item_type == "SOCKET" and item.in_out == "INPUT"]
+    return list(group.inputs)
+
+def clear_group(group):
+    group.nodes.clear()
+    if bpy.app.version >= (4, 0, 0):
+        group.interface.clear()
+    else:
+        group.inputs.clear()
+        group.outputs.clear()
+
+# links output socket to input socket or sets its value
+def set_socket(group, socket, value):
+    if isinstance(value, bpy.types.NodeSocket):
+        group.links.new(value, socket)
+    else:
+        socket.default_value = value
+
+# gets input of node with name (nodes can have hidden inputs with same name for other data types)
+def get_input(node, name):
+    return next(socket for socket in node.inputs if socket.name == name and socket.enabled)
+
+def get_output(node, name):
+    return next(socket for socket in node.outputs if socket.name == name and socket.enabled)
+
+# adds node with properties and named inputs set, returns node
+def add_node(group, node_type, inputs=(), **properties):
+    node = group.nodes.new(node_type)
+    for name, value in properties.items():
+        setattr(node, name, value)
+    for name, value in inputs:
+        set_socket(group, get_input(node, name), value)
+    return node
+
+# adds math node and returns its output
+def math_node(group, operation, a, b=0.0):
+    node = group.nodes.new("ShaderNodeMath")
+    node.operation = operation
+    set_socket(group, node.inputs[0], a)
+    set_socket(group, node.inputs[1], b)
+    return node.outputs[0]
+
+# adds switch node (true_value when condition, false_value otherwise) and returns its output
+def switch_node(group, input_type, condition, false_value, true_value):
+    node = group.nodes.new("GeometryNodeSwitch")
+    node.input_type = input_type
+    inputs = [socket for socket in node.inputs if socket.enabled]
+    set_socket(group, inputs[0], condition)
+    if false_value is not None:
+        set_socket(group, inputs[1], false_value)
+    set_socket(group, inputs[2], true_value)
+    return next(socket for socket in node.outputs if socket.enabled)
+
+def compare_node(group, operation, a, b):
+    node = add_node(group, "FunctionNodeCompare", (("A", a), ("B", b)), data_type="FLOAT", operation=operation)
+    return get_output(node, "Result")
+
+def boolean_node(group, operation, a, b=False):
+    node = group.nodes.new("FunctionNodeBooleanMath")
+    node.operation = operation
+    inputs = [socket for socket in node.inputs if socket.enabled]
+    set_socket(group, inputs[0], a)
+    if len(inputs) > 1:
+        set_socket(group, inputs[1], b)
+    return node.outputs[0]
+
+# adds nodes for how far below straight line every point of curve is (same as wire_geometry.evaluate_spans)
+# returns offset vector field
+def add_sag_nodes(group, droop, catenary):
+    factor = get_output(group.nodes.new("GeometryNodeSplineParameter"), "Factor")
+    length = get_output(group.nodes.new("GeometryNodeSplineLength"), "Length")
+    # parabola: droop*4*t*(1-t) below straight line
+    parabola = math_node(group, "MULTIPLY", math_node(group, "MULTIPLY", factor, math_node(group, "SUBTRACT", 1.0, factor)), math_node(group, "MULTIPLY", droop, -4.0))
+    # catenary: same newton's method as wire_geometry.catenary_constants on u = half span/constant
+    half_dist = math_node(group, "MULTIPLY", length, 0.5)
+    ratio = math_node(group, "DIVIDE", droop, half_dist)
+    log_ratio = math_node(group, "LOGARITHM", ratio, math.e)
+    u = switch_node(group, "FLOAT", compare_node(group, "LESS_THAN", ratio, 1.0),
+                    math_node(group, "MAXIMUM", math_node(group, "LOGARITHM", math_node(group, "MULTIPLY", ratio, 4.0), math.e), 1.0),
+                    math_node(group, "MULTIPLY", ratio, 2.0))
+    for i in range(CATENARY_ITERATIONS):
+        half_u = math_node(group, "MULTIPLY", u, 0.5)
+        # log(sinh(u/2)) = u/2 - log(2) + log(1 - exp(-u)) does not overflow
+        log_sinh = math_node(group, "ADD", math_node(group, "SUBTRACT", half_u, math.log(2)),
+                             math_node(group, "LOGARITHM", math_node(group, "SUBTRACT", 1.0, math_node(group, "EXPONENT", math_node(group, "MULTIPLY", u, -1.0))), math.e))
+        f = math_node(group, "SUBTRACT", math_node(group, "SUBTRACT", math_node(group, "ADD", math_node(group, "MULTIPLY", log_sinh, 2.0), math.log(2)),
+                                                   math_node(group, "LOGARITHM", u, math.e)), log_ratio)
+        df = math_node(group, "SUBTRACT", math_node(group, "DIVIDE", 1.0, math_node(group, "TANH", half_u)), math_node(group, "DIVIDE", 1.0, u))
+        u = math_node(group, "MAXIMUM", math_node(group, "SUBTRACT", u, math_node(group, "DIVIDE", f, df)), math_node(group, "MULTIPLY", u, 0.1))
+    constant = math_node(group, "DIVIDE", half_dist, u)
+    # x/constant goes from -u to u along wire
+    x_ratio = math_node(group, "MULTIPLY", math_node(group, "SUBTRACT", math_node(group, "MULTIPLY", factor, 2.0), 1.0), u)
+    catenary_sag = math_node(group, "MULTIPLY", constant, math_node(group, "SUBTRACT", math_node(group, "COSH", x_ratio), math_node(group, "COSH", u)))
+    use_catenary = boolean_node(group, "AND", catenary, compare_node(group, "GREATER_THAN", ratio, CATENARY_MIN_RATIO))
+    sag = switch_node(group, "FLOAT", use_catenary, parabola, catenary_sag)
+    return add_node(group, "ShaderNodeCombineXYZ", (("Z", sag),)).outputs[0]
+
+# makes nodes of node group: edges of mesh to wires (edge or tube) with balls
+def build_node_group(group):
+    clear_group(group)
+    new_group_socket(group, "Geometry", "NodeSocketGeometry", "INPUT")
+    for name, socket_type in GROUP_INPUTS:
+        new_group_socket(group, name, socket_type, "INPUT")
+    new_group_socket(group, "Geometry", "NodeSocketGeometry", "OUTPUT")
+    group_input = group.nodes.new("NodeGroupInput")
+    group_output = group.nodes.new("NodeGroupOutput")
+    inputs = {socket.name: socket for socket in group_input.outputs}
+    # every edge is straight line from start to end of span
+    lines = get_output(add_node(group, "GeometryNodeMeshToCurve", (("Mesh", inputs["Geometry"]),)), "Curve")
+    sag = add_sag_nodes(group, inputs["Droop"], inputs["Catenary"])
+    # wire
+    point_count = math_node(group, "ADD", inputs["Segments"], 1.0)
+    wire = get_output(add_node(group, "GeometryNodeResampleCurve", (("Curve", lines), ("Count", point_count))), "Curve")
+    wire = get_output(add_node(group, "GeometryNodeSetPosition", (("Geometry", wire), ("Offset", sag))), "Geometry")
+    circle = get_output(add_node(group, "GeometryNodeCurvePrimitiveCircle", (("Resolution", inputs["Sides"]), ("Radius", inputs["Radius"]))), "Curve")
+    tube_node = add_node(group, "GeometryNodeCurveToMesh", (("Curve", wire), ("Profile Curve", circle)))
+    if "Fill Caps" in tube_node.inputs:
+        get_input(tube_node, "Fill Caps").default_value = True
+    edges = get_output(add_node(group, "GeometryNodeCurveToMesh", (("Curve", wire),)), "Mesh")
+    wire_geometry_out = switch_node(group, "GEOMETRY", inputs["Thick"], edges, get_output(tube_node, "Mesh"))
+    wire_geometry_out = get_output(add_node(group, "GeometryNodeSetShadeSmooth", (("Geometry", wire_geometry_out), ("Shade Smooth", inputs["Smooth"]))), "Geometry")
+    # balls split wire into ball amount+1 equal parts, so points at ends of curve are not balls
+    ball_count = math_node(group, "ADD", inputs["Ball Amount"], 2.0)
+    ball_points = get_output(add_node(group, "GeometryNodeResampleCurve", (("Curve", lines), ("Count", ball_count))), "Curve")
+    ball_points = get_output(add_node(group, "GeometryNodeSetPosition", (("Geometry", ball_points), ("Offset", sag))), "Geometry")
+    ends = get_output(add_node(group, "GeometryNodeCurveEndpointSelection", (("Start Size", 1), ("End Size", 1))), "Selection")
+    sphere = get_output(add_node(group, "GeometryNodeMeshUVSphere", (("Segments", inputs["Ball Sides"]), ("Rings", inputs["Ball Rings"]), ("Radius", inputs["Ball Radius"]))), "Mesh")
+    ico_sphere = get_output(add_node(group, "GeometryNodeMeshIcoSphere", (("Radius", inputs["Ball Radius"]), ("Subdivisions", inputs["Ico Subdivisions"]))), "Mesh")
+    sphere = switch_node(group, "GEOMETRY", inputs["Ico Ball"], sphere, ico_sphere)
+    sphere = get_output(add_node(group, "GeometryNodeSetShadeSmooth", (("Geometry", sphere),)), "Geometry")
+    balls = get_output(add_node(group, "GeometryNodeInstanceOnPoints", (("Points", ball_points), ("Selection", boolean_node(group, "NOT", ends)), ("Instance", sphere))), "Instances")
+    balls = switch_node(group, "GEOMETRY", inputs["Balls"], None, balls)
+    join = group.nodes.new("GeometryNodeJoinGeometry")
+    group.links.new(wire_geometry_out, join.inputs[0])
+    group.links.new(balls, join.inputs[0])
+    group.links.new(join.outputs[0], group_output.inputs[0])
+    group["wire_nodes_version"] = NODE_GROUP_VERSION
+
+# gets node group shared by all procedural networks, makes it if it does not exist or is old
+# looked up by name every time as node group references do not survive undo
+def get_node_group():
+    group = bpy.data.node_groups.get(NODE_GROUP_NAME)
+    if group is None:
+        group = bpy.data.node_groups.new(NODE_GROUP_NAME, "GeometryNodeTree")
+    if group.get("wire_nodes_version", None) != NODE_GROUP_VERSION:
+        build_node_group(group)
+    return group
+
+# sets node group inputs of network to settings
+# returns True if any input changed (network is drawn again by blender)
+def set_network_inputs(net_obj, settings):
+    modifier = net_obj.modifiers.get("wire_nodes")
+    identifiers = {socket.name: socket.identifier for socket in get_group_inputs(modifier.node_group)}
+    changed = False
+    for name, value in get_input_values(settings).items():
+        identifier = identifiers[name]
+        if modifier.get(identifier, None) != value:
+            modifier[identifier] = value
+            changed = True
+    if changed:
+        net_obj.update_tag()
+    return changed
+
+# fills network mesh with start and end point of every span, hooks points to poles and adds nodes
+# spans is list of (start_obj, end_obj, mushroom_index), span_points is list of (start, end) coordinates for each span
+def fill_network(net_obj, spans, span_points, settings):
+    mesh = net_obj.data
+    mesh.clear_geometry()
+    vertices = [point for span in span_points for point in span]
+    edges = [(2*i, 2*i+1) for i in range(len(span_points))]
+    wire_mesh.fill_mesh(mesh, vertices, edges)
+    for modifier in list(net_obj.modifiers):
+        net_obj.modifiers.remove(modifier)
+    # vertices each pole moves
+    pole_vertices = {}
+    for i, (start_obj, end_obj, mushroom_index) in enumerate(spans):
+        pole_vertices.setdefault(start_obj.name, (start_obj, []))[1].append(2*i)
+        pole_vertices.setdefault(end_obj.name, (end_obj, []))[1].append(2*i+1)
+    for pole, indices in pole_vertices.values():
+        hook = net_obj.modifiers.new(f"hook_{pole.name}", "HOOK")
+        hook.object = pole
+        hook.vertex_indices_set(indices)
+        # vertices are where pole is now
+        hook.matrix_inverse = pole.matrix_world.inverted()
+    nodes = net_obj.modifiers.new("wire_nodes", "NODES")
+    nodes.node_group = get_node_group()
+    set_network_inputs(net_obj, settings)
+    # span table (same as wire_network)
+    net_obj["span_starts"] = [span[0] for span in spans]
+    net_obj["span_ends"] = [span[1] for span in spans]
+    net_obj["span_mushrooms"] = [span[2] for span in spans]
+    net_obj["span_offsets"] = list(range(0, 2*len(spans)+1, 2))
+
+# makes procedural network object with name for spans
+def build_network(name, spans, span_points, settings):
+    net_obj = bpy.data.objects.new(name, wire_mesh.new_mesh(name))
+    wire_mesh.link_object(net_obj)
+    net_obj["wire_network"] = True
+    net_obj["wire_procedural"] = True
+    fill_network(net_obj, spans, span_points, settings)
+    return net_obj
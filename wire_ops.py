@@ -1,91 +1,71 @@
 import bpy
 import math
+import os
+import time
 import mathutils
-from . import wire_pole
+from bpy_extras.io_utils import ImportHelper
+from . import wire_pole, wire_geometry, wire_mesh, wire_network, wire_curve, wire_nodes, wire_registry, wire_routes, wire_stats, wire_pool, wire_cache
+
+# names of selected objects in order of selection
+# kept in memory and updated from difference with currently selected objects,
+# so cost depends on how many objects are selected and not on how many objects are in file
+selection_order = []
 
-# https://blender.stackexchange.com/questions/253427/python-blender-get-selected-object-in-order-of-selection
 # gets list of selected objects in order of selection
 def get_ordered_selection_objects():
-    # list of selected objects
-    tagged_objects = []
-    for obj in bpy.data.objects:
-        # if no "selection_order" exists for current object -1 is returned
-        order_index = obj.get("selection_order", -1)
-        if order_index >= 0:
-            tagged_objects.append((order_index, obj))
-    tagged_objects = sorted(tagged_objects, key=lambda item: item[0])
-    return [obj for i, obj in tagged_objects]
-
-# clears selection order flag
-def clear_order_flag(obj):
-    try:
-        del obj["selection_order"]
-    except KeyError:
-        pass
+    selected = {obj.name: obj for obj in bpy.context.selected_objects}
+    return [selected[name] for name in selection_order if name in selected]
 
 # updates selection order when object is selected or deselected
 def update_selection_order():
-    # do not want selection order for 
-    if not bpy.context.selected_objects:
-        for obj in bpy.data.objects:
-            clear_order_flag(obj)
+    selected_objects = bpy.context.selected_objects
+    # do not want selection order for nothing selected
+    if not selected_objects:
+        selection_order.clear()
         return
-    selection_order = get_ordered_selection_objects()
-    idx = 0
-    for obj in selection_order:
-        if not obj.select_get():
-            selection_order.remove(obj)
-            clear_order_flag(obj)
+    selected_names = {obj.name for obj in selected_objects}
+    # remove deselected objects keeping order of others
+    selection_order[:] = [name for name in selection_order if name in selected_names]
+    # newly selected objects go to end
+    ordered_names = set(selection_order)
+    for obj in selected_objects:
+        if obj.name not in ordered_names:
+            selection_order.append(obj.name)
+            ordered_names.add(obj.name)
+
+# deletes wires of spans (separate objects or wires in network mesh), spans stay in registry
+# only meshes made for wires and balls are deleted, other meshes with no users are left alone
+# network meshes are drawn again once without wires of spans (deleted if no wires are left)
+def clear_spans(span_ids):
+    networks = {}
+    for span_id in span_ids:
+        span = wire_registry.get_span(span_id)
+        net_obj = span.get("network", None)
+        if net_obj is not None:
+            cleared = networks.setdefault(net_obj.name, (net_obj, set()))[1]
+            if span["start"] is not None and span["end"] is not None:
+                cleared.add((span["start"].name, span["end"].name))
+        for key in ("network", "network_spans"):
+            if key in span:
+                del span[key]
+        wire_registry.remove_span_objects(span_id)
+    for net_obj, cleared in networks.values():
+        remaining = [span for span in wire_network.get_spans(net_obj)
+                     if span[0] is not None and span[1] is not None and (span[0].name, span[1].name) not in cleared]
+        if remaining:
+            fill_network(net_obj, remaining, get_wire_settings())
         else:
-            obj["selection_order"] = idx
-            idx += 1
-    for obj in bpy.context.selected_objects:
-        if obj not in selection_order:
-            obj["selection_order"] = len(selection_order)
-            selection_order.append(obj)
-
-# deletes existing wires and cleans up left over meshes
-def remove_existing_wires(start_obj, end_obj):
-    # delete existing wires
-    if start_obj is not None:
-        if start_obj.get("output_wire", None):
-            for wire in start_obj["output_wire"]:
-                #print(wire) #<-- debug
-                if wire is not None:
-                    bpy.data.objects.remove(wire)
-            del start_obj["output_wire"]
-        if start_obj.get("output_wire_balls", None):
-            for ball in start_obj["output_wire_balls"]:
-                if ball is not None:
-                    bpy.data.objects.remove(ball)
-            del start_obj["output_wire_balls"]
-        if start_obj.get("start_vector", None):
-            del start_obj["start_vector"]
-    if end_obj is not None:
-        if end_obj.get("input_wire", None):
-            for wire in end_obj["input_wire"]:
-                if wire is not None:
-                    bpy.data.objects.remove(wire)
-            del end_obj["input_wire"]
-        if end_obj.get("input_wire_balls", None):
-            for ball in end_obj["input_wire_balls"]:
-                if ball is not None:
-                    bpy.data.objects.remove(ball)
-            del end_obj["input_wire_balls"]
-        if end_obj.get("end_vector", None):
-            del end_obj["end_vector"]
-    # delete existing wire meshes with no users (leftover from deleted wires)
-    # otherwise there will be many meshes with no users and slows blender down
-    for mesh_block in bpy.data.meshes:
-        if mesh_block.users == 0:
-            #print(f'Deleting mesh {mesh_block.name}')
-            bpy.data.meshes.remove(mesh_block)
+            wire_network.remove_network(net_obj)
+
+# checks if object is pole saved in pole library
+def is_pole(obj):
+    return obj.name.split('.')[0] in wire_pole.PolesDict().poles
 
 # gets the selected poles from ordered selection
 def get_selected_poles():
     selected_poles = []
     for obj in get_ordered_selection_objects():
-        if obj.name.split('.')[0] in wire_pole.PolesDict().poles:
+        if is_pole(obj):
             selected_poles.append(obj)
         else:
             print(f"{obj.name} not in pole_dict")
@@ -94,10 +74,10 @@ def get_selected_poles():
 # gets mushroom coordinates of selected pole
 def get_mushroom(pole_name):
     pole_name = pole_name.split('.')[0]
-    #if pole_name in self.pole_dict:
-    if pole_name in wire_pole.PolesDict().poles:
+    poles = wire_pole.PolesDict().poles
+    if pole_name in poles:
         # returns dict with input and output keys containing input or output coordinates
-        return wire_pole.PolesDict().poles[pole_name]
+        return poles[pole_name]
     else:
         print(f"{pole_name} not in pole_dict")
         return None
@@ -110,456 +90,414 @@ def get_coordinates(obj, mushroom):
     global_coord_vector = obj.matrix_world @ coord_vector
     return global_coord_vector
 
-# get z coordinate for parabola or catenary (use correct equation depending on catenary_enabled)
-def get_wire_z(x, p_segment, pole_dist, droop, catenary_enabled, start_z):
-    if catenary_enabled:
-        #print("catenary") #<-- debug
-        a = (pole_dist**2)/(8*droop)
-        # fixing catenary equation constant
-        a_tol = 0.5
-        # x needs to be start x to get correct constant
-        dummy_x = -(pole_dist/2)
-        catenary = a*(math.cosh((dummy_x)/a)) + (start_z-a-droop)
-        # check if constant is within tolerance
-        while not (catenary <= (start_z + a_tol) and catenary >= (start_z - a_tol)):
-            if catenary >= (start_z + a_tol):
-                a += 0.1
-            elif catenary <= (start_z - a_tol):
-                a -= 0.1
-            catenary = a*(math.cosh((dummy_x)/a)) + (start_z-a-droop)
-        return a*(math.cosh((x+p_segment)/a)) - a
-    else:
-        #print("parabola") #<-- debug
-        a = droop/((pole_dist**2)/4)
-        return a*((x+p_segment)**2)
-    
 # draws a ball with radius and sides at given coordinates
-# not using blender primitive sphere as they cause issues with auto updating
-def draw_ball(radius, sides, start_x, start_y, start_z):
-    # angle increment for horizontal circle (angle between vertices)
-    h_angle_increment = (2*math.pi)/sides
-
-    # top and bottom points of circle
-    top = (start_x, start_y, start_z+radius)
-    bottom = (start_x, start_y, start_z-radius)
-    # coordinate list
-    c_list = []
-    # face list
-    f_list = []
-    # add bottom to coordinate list because starting at -90 degrees
-    c_list.append(bottom)
-
-    # angle (theta) for horizontal circle
-    h_angle = 0
-    # angle (phi) for vertical circle
-    v_angle = -math.pi/2  # setting to -90 degrees
-
-    # making points
-    # amount of horizontal circles
-    h_circle_count = sides  # (sides - 2)/2 -> sides
-    # increment for vertical circle (angle between horizontal circles)
-    v_angle_increment = (2*math.pi)/(2*h_circle_count)
-    # draw many horizontal circles with different radii
-    for h_circle in range(int(h_circle_count)):
-        # start angle at -90 degrees + increment
-        v_angle += v_angle_increment
-        for i in range(sides):
-            # radius of horizontal circle based on vertical angle
-            h_radius = radius*math.cos(v_angle)
-            # x y and z coordinates
-            x = h_radius*(math.cos(h_angle)) + start_x
-            y = h_radius*(math.sin(h_angle)) + start_y
-            z = radius*math.sin(v_angle) + start_z
-            # add coordinate tuple to list
-            c_list.append((x, y, z))
-            # increment horizontal angle
-            h_angle += h_angle_increment
-
-    # add top to list
-    c_list.append(top)
-
-    # bottom section
-    for v in range(sides):
-        v += 1  # skip bottom, bottom is 0
-        face = (v+1, v, 0)
-        # if v is last point on bottom circle, connect to first point
-        if v == sides:
-            face = (1, v, 0)
-        f_list.append(face)
-
-    # middle sections
-    for circle in range(int(h_circle_count)-1):
-        for v in range(sides):
-            v += 1 + (sides*(circle+1))  # skip bottom and go to current point
-            # 0 + 1 + (8*(0+1)) = 9
-            face = (v, v-sides, v-sides+1, v+1)  # v, v+1, v-sides+1, v-sides
-            # if v is last point on current horizontal circle, connect to first point (in 8 segment circle, it is 16, 24, etc.)
-            if v == (sides*(circle+2)):
-                face = (v, v-sides, v-sides-sides+1, v-sides+1)
-            f_list.append(face)
-
-    # top section
-    for v in range(sides):
-        v += 1 + sides*(int(h_circle_count)-1)  # go to current point
-        h = len(c_list)-1  # top point
-        face = (h, v, v+1)
-        # if v is last point before top point connect to first point in this circle
-        if v == (sides*(int(h_circle_count))):
-            face = (h, v, v-sides+1)
-        f_list.append(face)
-
+# all balls with same radius and sides (or ico_budget) share one mesh, ball object is moved to coordinates
+def draw_ball(radius, sides, start_x, start_y, start_z, ico_budget=0):
+    ball_mesh = wire_mesh.get_ball_mesh(radius, sides, ico_budget)
     # balls that are created are named ball
-    obj_name = "ball"
-    scn = bpy.context.collection
-    ball_mesh = bpy.data.meshes.new(obj_name)
-    ball_ob = bpy.data.objects.new(obj_name, ball_mesh)
-    scn.objects.link(ball_ob)
-    # making all points and drawing line between them
-    ball_mesh.from_pydata(c_list, [], f_list)
-    for poly in ball_mesh.polygons:
-        poly.use_smooth = True
-    ball_mesh.update()
+    ball_ob = bpy.data.objects.new("ball", ball_mesh)
+    ball_ob.location = (start_x, start_y, start_z)
+    wire_mesh.link_object(ball_ob)
     return ball_ob
 
-# draw wire using quadratic equation
-# can modify droop and segments
-def draw_parabolic(w_name, droop, w_segment, start_x, start_y, start_z, end_x, end_y, end_z, catenary_enabled):
-    # get distance bewteen poles
-    pole_dist = math.sqrt((end_x-start_x)**2 + (end_y-start_y)**2 + (end_z-start_z)**2)
-    # distance per segment
-    p_segment = pole_dist/w_segment
-
-    x_list = []
-    y_list = []
-    z_list = []
-    x = -(pole_dist/2)
-    # create list of coordinates for parabola
-    for i in range(1, w_segment):
-        # get x, y, z
-        wire_z = get_wire_z(x, p_segment, pole_dist, droop, catenary_enabled, start_z) + ((start_z+(i*((end_z-start_z)/w_segment)))-droop)
-        x_list.append((start_x+(i*((end_x-start_x)/w_segment))))
-        y_list.append((start_y+(i*((end_y-start_y)/w_segment))))
-        z_list.append(wire_z)
-        x += p_segment
-
-    # adding coordinates to tuple
-    co_list = [(start_x, start_y, start_z), (end_x, end_y, end_z)]
-    ln_list = [(0, 1)]
-    for i in range(1, w_segment):
-        co_list.insert(i, (x_list[i-1], y_list[i-1], z_list[i-1]))
-        ln_list.append((i, (i+1)))
-
-    scn = bpy.context.collection
-    w_mesh = bpy.data.meshes.new(w_name)
-    w_obj = bpy.data.objects.new(w_name, w_mesh)
-    scn.objects.link(w_obj)
-    # making all points and lines
-    w_mesh.from_pydata(co_list, ln_list, [])
-    w_mesh.update()
-    return w_obj
-
-# draw line between start and end points for straight wire
-# this is when droop is 0 or segments is 1
-def draw_wire(w_name, start_x, start_y, start_z, end_x, end_y, end_z):
-    co_list = [(start_x, start_y, start_z), (end_x, end_y, end_z)]
-    ln_list = [(0, 1)]
-    scn = bpy.context.collection
-    w_mesh = bpy.data.meshes.new(w_name)
-    w_obj = bpy.data.objects.new(w_name, w_mesh)
-    scn.objects.link(w_obj)
-    # making all points and lines
-    w_mesh.from_pydata(co_list, ln_list, [])
-    w_mesh.update()
-    return w_obj
-
-# draw 3d wire between start and end points for straight wire (draw_wire but with thickness)
-def draw_wire_3d(w_name, radius, start_x, start_y, start_z, end_x, end_y, end_z, sides, shade_smooth):
-    angle_increment = (2*math.pi)/sides
-    path_list = [(start_x, start_y, start_z), (end_x, end_y, end_z)]
-    c_list = []
-    # make circles
-    angle = 0
-    for i in range(len(path_list)-1):
-        # current point
-        x, y, z = path_list[i]
-        # next point
-        x2, y2, z2 = path_list[i+1]
-        # doing the same thing for all points in the circle (sides)
-        for j in range(sides):
-            # make directional vector between current and next point
-            dir_vec = mathutils.Vector((x2-x, y2-y, 0))
-            # make rotational axis vector (to rotate around later)
-            rot_vec = mathutils.Vector((x2-x, y2-y, z2-z))
-
-            # make the point on the circle
-            # its a vector parallel to current wire segment with length of radius
-            point = ((mathutils.Vector((x, y, z)) + (dir_vec.normalized())*radius) - mathutils.Vector((x, y, z)))
-            # rotate point to be perpendicular to wire segment
-            point.rotate(mathutils.Euler((0, 0, math.radians(90)), "XYZ"))
-            # make 3x3 rotational matrix to rotate point around rot_vec
-            rot_mat = mathutils.Matrix.Rotation(angle, 3, rot_vec)
-            # rotate point by matrix
-            point.rotate(rot_mat)
-            # move point back to correct coordinates
-            point += mathutils.Vector((x, y, z))
-            # add point to list
-            c_list.append((point.x, point.y, point.z))
-            # increment angle
-            angle += angle_increment
-
-    # make directional vector between current and next point
-    dir_vec = mathutils.Vector((end_x-start_x, end_y-start_y, 0))
-    # make rotational axis vector (to rotate around later)
-    rot_vec = mathutils.Vector((end_x-start_x, end_y-start_y, end_z-start_z))
-    for i in path_list:
-        # get x, y, z from current point
-        x, y, z = i
-        for j in range(sides):
-            # make point on the circle
-            # its a vector parallel to current wire with length of radius
-            point = ((mathutils.Vector((x, y, z)) + (dir_vec.normalized())*radius) - mathutils.Vector((x, y, z)))
-            # rotate point to be perpendicular to wire
-            point.rotate(mathutils.Euler((0, 0, math.radians(90)), "XYZ"))
-            # make 3x3 rotational matrix to rotate point around rot_vec
-            rot_mat = mathutils.Matrix.Rotation(angle, 3, rot_vec)
-            # rotate point by matrix
-            point.rotate(rot_mat)
-            # move point back to correct coordinates
-            point += mathutils.Vector((x, y, z))
-            # add point to list
-            c_list.append((point.x, point.y, point.z))
-            # increment angle
-            angle += angle_increment
-
-    # making faces
-    f_list = []
-    # do not want to go out of bounds
-    for i in range(len(c_list)-sides):
-        # if  i == 0, 8, 16, etc. (first point in circle)
-        if i%sides == 0:
-            f_list.append((i, i+sides, i+sides+sides-1, i+sides-1))
-        else:
-            f_list.append((i, i+sides, i+sides-1, i-1))
-    # start face
-    start_cap = []
-    end_cap = []
-    for i in range(sides):
-        # goes from 0->sides-1
-        # vertex 0 is 0 degrees, sides/4 = 90 degrees, etc (goes counter clockwise)
-        start_cap.append((sides-1)-i)
-        end_cap.append(len(c_list)-(sides)+i)
-    f_list.append(start_cap)
-    f_list.append(end_cap)
-
-    # creating mesh and object
-    scn = bpy.context.collection
-    w_mesh = bpy.data.meshes.new(w_name)
-    w_ob = bpy.data.objects.new(w_name, w_mesh)
-    scn.objects.link(w_ob)
-    # making all points and drawing line between them
-    w_mesh.from_pydata(c_list, [], f_list)
-    # making smooth
-    if shade_smooth:
-        for poly in w_mesh.polygons:
-            poly.use_smooth = True
-    w_mesh.update()
-    return w_ob
-
-# draw parabola or catenary wire with thickness
-def parabolic_wire_3d(w_name, droop, w_segment, radius, start_x, start_y, start_z, end_x, end_y, end_z, catenary_enabled, sides, shade_smooth):
-    # amount to add to angle for each side
-    angle_increment = (2*math.pi)/sides
-    
-    # get distance bewteen poles
-    pole_dist = math.sqrt((end_x-start_x)**2 + (end_y-start_y)**2 + (end_z-start_z)**2)
-    # current segment (x value)
-    p_segment = pole_dist/w_segment
-
-    # list of wire path (parabola)
-    path_list = [(start_x, start_y, start_z)]
-    # list of coordinates (circles following parabola)
-    c_list = []
-    x = -(pole_dist/2)
-    # create list of coordinates for parabola
-    for i in range(1, w_segment):
-        # get x, y, z coordinates
-        path_z = get_wire_z(x, p_segment, pole_dist, droop, catenary_enabled, start_z) + ((start_z+(i*((end_z-start_z)/w_segment)))-droop)
-        path_x = (start_x+(i*((end_x-start_x)/w_segment)))
-        path_y = (start_y+(i*((end_y-start_y)/w_segment)))
-        # adding all in tuple to path_list
-        path_list.append((path_x, path_y, path_z))
-        x += p_segment
-
-    # adding end point to path_list
-    path_list.append((end_x, end_y, end_z))
-
-    # make circles
-    angle = 0
-    for i in range(len(path_list)-1):
-        # current point
-        x, y, z = path_list[i]
-        # next point
-        x2, y2, z2 = path_list[i+1]
-        # doing the same thing for all points in the circle (sides)
-        for j in range(sides):
-            # make directional vector between current and next point
-            dir_vec = mathutils.Vector((x2-x, y2-y, 0))
-            # make rotational axis vector (to rotate around later)
-            rot_vec = mathutils.Vector((x2-x, y2-y, z2-z))
-
-            # make the point on the circle
-            # its a vector parallel to current wire segment with length of radius
-            point = ((mathutils.Vector((x, y, z)) + (dir_vec.normalized())*radius) - mathutils.Vector((x, y, z)))
-            # rotate point to be perpendicular to wire segment
-            point.rotate(mathutils.Euler((0, 0, math.radians(90)), "XYZ"))
-            # make 3x3 rotational matrix to rotate point around rot_vec
-            rot_mat = mathutils.Matrix.Rotation(angle, 3, rot_vec)
-            # rotate point by matrix
-            point.rotate(rot_mat)
-            # move point back to correct coordinates
-            point += mathutils.Vector((x, y, z))
-            # add point to list
-            c_list.append((point.x, point.y, point.z))
-            # increment angle
-            angle += angle_increment
-    
-    # making circle for end point
-    # current point is end_x, end_y, end_z
-    # previous point
-    prev_x, prev_y, prev_z = path_list[-2]
-    # direction vector
-    dir_vec = mathutils.Vector((end_x-prev_x, end_y-prev_y, 0))
-    # rotational axis vector
-    rot_vec = mathutils.Vector((end_x-prev_x, end_y-prev_y, end_z-prev_z))
-
-    # make circle
-    angle = 0
-    for i in range(sides):
-        point = mathutils.Vector((end_x, end_y, end_z)) + dir_vec.normalized()*radius - mathutils.Vector((end_x, end_y, end_z))
-        point.rotate(mathutils.Euler((0, 0, math.radians(90)), "XYZ"))
-        rot_mat = mathutils.Matrix.Rotation(angle, 3, rot_vec)
-        point.rotate(rot_mat)
-        point += mathutils.Vector((end_x, end_y, end_z))
-        c_list.append((point.x, point.y, point.z))
-        angle += angle_increment
-    
-    # making faces
-    f_list = []
-    # do not want to go out of bounds
-    for i in range(len(c_list)-sides):
-        # if  i == 0, 8, 16, etc. (first point in circle)
-        if i%sides == 0:
-            f_list.append((i, i+sides, i+sides+sides-1, i+sides-1))
-        else:
-            f_list.append((i, i+sides, i+sides-1, i-1))
-    # start and end faces
-    start_cap = []
-    end_cap = []
-    for i in range(sides):
-        # goes from 0->sides-1
-        # vertex 0 is 0 degrees, sides/4 = 90 degrees, etc (goes counter clockwise)
-        start_cap.append((sides-1)-i)
-        end_cap.append(len(c_list)-(sides)+i)
-    f_list.append(start_cap)
-    f_list.append(end_cap)
-
-    # making mesh
-    scn = bpy.context.collection
-    w_mesh = bpy.data.meshes.new(w_name)
-    w_obj = bpy.data.objects.new(w_name, w_mesh)
-    scn.objects.link(w_obj)
-    # making all points and lines
-    w_mesh.from_pydata(c_list, [], f_list)
-    # making smooth
-    if shade_smooth:
-        for poly in w_mesh.polygons:
-            poly.use_smooth = True
-    w_mesh.update()
-    # return created object
-    return w_obj
-
-# makes desired amount of balls on wire at locations following parabolic wire
-def make_balls(amount, droop, radius, sides, start_x, start_y, start_z, end_x, end_y, end_z):
-    # getting distance between poles
-    pole_dist = math.sqrt((end_x-start_x)**2 + (end_y-start_y)**2 + (end_z-start_z)**2)
-    a = droop/((pole_dist**2)/4)
-    # total amount of "segments" in wire
-    p_segment = pole_dist/(amount+1)
-    x = (-(pole_dist/2))
+# makes desired amount of balls on wire at locations following parabolic or catenary wire
+def make_balls(amount, droop, radius, sides, start_x, start_y, start_z, end_x, end_y, end_z, catenary_enabled=False, constants=None, ico_budget=0):
+    balls_co = wire_geometry.ball_positions((start_x, start_y, start_z), (end_x, end_y, end_z), droop, amount, catenary_enabled, constants)
+    return draw_balls(balls_co, radius, sides, ico_budget)
+
+# draws ball at every center (centers is (n, 3) array)
+def draw_balls(centers, radius, sides, ico_budget=0):
     balls_list = []
-    for i in range(1, amount+1):
-        # coordinates to draw ball
-        balls_x = (i)*(end_x-start_x)/(amount+1) + start_x
-        balls_y = (i)*(end_y-start_y)/(amount+1) + start_y
-        balls_z = a*((x+p_segment))**2 + ((i)*(end_z-start_z)/(amount+1) + start_z-droop)
-        x += p_segment
+    for balls_x, balls_y, balls_z in centers.tolist():
         # make ball object
-        balls_list.append(draw_ball(radius, sides, balls_x, balls_y, balls_z))
+        balls_list.append(draw_ball(radius, sides, balls_x, balls_y, balls_z, ico_budget))
     return balls_list
 
+# gets wire config as values that do not change when config changes
+def get_wire_settings():
+    wire_config = bpy.context.scene.wire_config
+    return wire_geometry.WireSettings(
+        droop=wire_config.droop,
+        segments=wire_config.segments,
+        catenary=wire_config.catenary_wire,
+        thick=wire_config.thick_wire,
+        radius=wire_config.wire_thickness,
+        sides=wire_config.wire_sides,
+        smooth=wire_config.shade_wire_smooth,
+        balls_enabled=wire_config.wire_balls_enabled,
+        ball_radius=wire_config.wire_ball_radius,
+        ball_sides=wire_config.wire_ball_sides,
+        ball_amount=wire_config.wire_ball_amount,
+        max_deviation=wire_config.max_deviation if wire_config.adaptive_segments else 0.0,
+        curve_type=wire_config.curve_type if wire_config.curve_wire else "",
+        curve_resolution=wire_config.curve_resolution,
+        ball_budget=wire_config.wire_ball_budget if wire_config.wire_ball_topology == "ICO" else 0,
+    )
+
+# gets cheap settings to draw wires with while pole is being moved
+# edge wires with capped segments and no balls, full wires are drawn after pole stops moving
+def get_preview_settings():
+    wire_config = bpy.context.scene.wire_config
+    settings = get_wire_settings()
+    return settings._replace(segments=min(settings.segments, wire_config.preview_segments), thick=False, balls_enabled=False)
+
+# camera location wires were last updated for level of detail from (only set by update_lod)
+lod_state = {"location": None}
+
+# gets camera used for level of detail or None if there is no scene camera
+def get_lod_camera():
+    scene = bpy.context.scene
+    camera = scene.camera
+    if camera is None or camera.type != "CAMERA":
+        return None
+    render = scene.render
+    width = render.resolution_x*render.resolution_percentage/100
+    location = tuple(camera.matrix_world.translation)
+    if camera.data.type == "ORTHO":
+        return wire_geometry.LodCamera(location, width/camera.data.ortho_scale, True)
+    return wire_geometry.LodCamera(location, width*camera.data.lens/camera.data.sensor_width, False)
+
+# gets settings for wires between two poles (span_points are (start, end) of each wire)
+# with fewer segments and sides when wires look small from camera and level of detail is enabled
+def get_pair_settings(settings, span_points):
+    wire_config = bpy.context.scene.wire_config
+    if not wire_config.lod_enabled or not span_points:
+        return settings
+    camera = get_lod_camera()
+    if camera is None:
+        return settings
+    minimums = (wire_config.lod_min_segments, wire_config.lod_min_sides, wire_config.lod_min_ball_sides)
+    start, end = span_points[0]
+    return wire_geometry.lod_settings(settings, start, end, camera, wire_config.lod_full_pixels, minimums)
+
+# draws wires again with new level of detail when camera moved more than threshold since last time
+def update_lod():
+    wire_config = bpy.context.scene.wire_config
+    camera = bpy.context.scene.camera
+    if not wire_config.lod_enabled or camera is None:
+        return
+    location = tuple(camera.matrix_world.translation)
+    last_location = lod_state["location"]
+    if last_location is not None and math.dist(location, last_location) < wire_config.lod_camera_threshold:
+        return
+    lod_state["location"] = location
+    settings = get_wire_settings()
+    changed_ids = []
+    spans = []
+    for span_id, span in wire_registry.get_registry().items():
+        # network wires do not use level of detail
+        if span.get("network", None) is not None:
+            continue
+        span_points = get_registry_span_points(span)
+        if span_points is None:
+            continue
+        pair_settings = get_pair_settings(settings, span_points)
+        if lod_changed(span, pair_settings):
+            changed_ids.append(span_id)
+            spans.append((span_points, pair_settings))
+    # only spans with new detail are drawn again, worked out together
+    for span_id, (span_points, pair_settings), geometry in zip(changed_ids, spans, get_spans_geometry(spans)):
+        # only balls changed detail
+        if rewrite_wires(span_id, span_points, pair_settings, geometry):
+            continue
+        wire_registry.remove_span_objects(span_id)
+        draw_span(span_id, span_points, pair_settings, geometry)
+
+# gets (start, end) of every wire of span from where its objects are now, None if span has no wires to update
+def get_registry_span_points(span):
+    wires = list(span.get("wires", None) or [])
+    start_obj = span.get("start", None)
+    end_obj = span.get("end", None)
+    if not wires or start_obj is None or end_obj is None:
+        return None
+    # wire between vertices
+    if "start_vector" in span:
+        start_vec = mathutils.Vector(span["start_vector"])
+        end_vec = mathutils.Vector(span["end_vector"])
+        return [((start_obj.matrix_world @ start_vec).to_tuple(), (end_obj.matrix_world @ end_vec).to_tuple())]
+    if get_mushroom(start_obj.name) is None or get_mushroom(end_obj.name) is None:
+        return None
+    return get_pole_span_points(start_obj, end_obj)
+
+# checks if wires (or balls) of span were drawn with other detail than settings
+def lod_changed(span, settings):
+    topology = list(wire_geometry.wire_topology_key(settings))
+    for wire in span.get("wires", None) or []:
+        if wire is None or list(wire.get("wire_topology", [])) != topology:
+            return True
+    if settings.balls_enabled:
+        ball_name = wire_mesh.ball_mesh_name(settings.ball_radius, settings.ball_sides, settings.ball_budget)
+        for ball in span.get("balls", None) or []:
+            if ball is None or ball.data.name != ball_name:
+                return True
+    return False
+
 # chooses what wire to draw depending on settings
-def choose_wire(w_name, start_x, start_y, start_z, end_x, end_y, end_z):
+# settings can be given to draw with other settings than wire config (preview)
+# geometry is span_parts of mesh wire already worked out (together with other wires), None for curve wires
+def choose_wire(w_name, start_x, start_y, start_z, end_x, end_y, end_z, settings=None, geometry=None):
     # list to return (will have wire and ball objects)
     return_list = []
     # get config
-    wire_config = bpy.context.scene.wire_config
-    droop = wire_config.droop
-    w_segment = wire_config.segments
-    catenary_enabled = wire_config.catenary_wire
-    thickness_enabled = wire_config.thick_wire
-    radius = wire_config.wire_thickness
-    # config for wire balls
-    balls_enabled = wire_config.wire_balls_enabled
-    balls_radius = wire_config.wire_ball_radius
-    balls_sides = wire_config.wire_ball_sides
-    balls_amount = wire_config.wire_ball_amount
-    #update_mode = wire_config.update_mode
-    wire_sides = wire_config.wire_sides
-    shade_wire_smooth = wire_config.shade_wire_smooth
-    
-    # wires
-    if (droop == 0) or (w_segment == 1):
-        # set droop to be 0 so that the balls will be in the right spot
-        droop = 0
-        # if thick wire but no droop or segments draw normal 3d wire
-        if thickness_enabled:
-            return_list.append(draw_wire_3d(w_name, radius, start_x, start_y, start_z, end_x, end_y, end_z, wire_sides, shade_wire_smooth))
-        # or just draw normal wire if no thick wire
-        else:
-            return_list.append(draw_wire(w_name, start_x, start_y, start_z, end_x, end_y, end_z))
-    # if thick wire is enabled
-    elif thickness_enabled:
-        return_list.append(parabolic_wire_3d(w_name, droop, w_segment, radius, start_x, start_y, start_z, end_x, end_y, end_z, catenary_enabled, wire_sides, shade_wire_smooth))
-    # if none of the above draw parabolic or catenary wire (parabolic by default)
+    if settings is None:
+        settings = get_wire_settings()
+    # curve wire, blender makes its tube from bevel
+    if settings.curve_type:
+        # set droop to be 0 for straight wire so that the balls will be in the right spot
+        droop = wire_geometry.span_droop(settings)
+        # solve sag equation once for span, used by wire and balls
+        pole_dist = math.sqrt((end_x-start_x)**2 + (end_y-start_y)**2 + (end_z-start_z)**2)
+        constants = wire_geometry.span_constants(pole_dist, droop, settings.catenary)
+        return_list.append(wire_curve.new_curve_object(w_name, (start_x, start_y, start_z), (end_x, end_y, end_z), settings, constants))
+    # mesh wire, only mesh is made
     else:
-        return_list.append(draw_parabolic(w_name, droop, w_segment, start_x, start_y, start_z, end_x, end_y, end_z, catenary_enabled))
+        vertices, edges, faces, centers = geometry
+        return_list.append(wire_mesh.new_mesh_object(w_name, vertices, edges, faces, settings.smooth))
+    # save what wire was drawn with to know if it can be rewritten in place
+    return_list[0]["wire_topology"] = list(wire_geometry.wire_topology_key(settings))
     # wire balls
-    if balls_enabled:
-        return_list.append((make_balls(balls_amount, droop, balls_radius, balls_sides, start_x, start_y, start_z, end_x, end_y, end_z)))
+    if settings.balls_enabled and settings.curve_type:
+        return_list.append((make_balls(settings.ball_amount, droop, settings.ball_radius, settings.ball_sides, start_x, start_y, start_z, end_x, end_y, end_z, settings.catenary, constants, settings.ball_budget)))
+    elif settings.balls_enabled:
+        return_list.append(draw_balls(centers, settings.ball_radius, settings.ball_sides, settings.ball_budget))
     return return_list
 
+# rewrites vertices of wires (and moves balls) of span in place for span_points (start, end) of each wire
+# returns False without changing anything if wires have to be drawn again (settings changed amount of vertices or objects)
+# geometry can be span_parts of every wire already worked out (together with other wires)
+def rewrite_wires(span_id, span_points, settings, geometry=None):
+    span = wire_registry.get_span(span_id)
+    wire_list = span.get("wires", None)
+    balls_list = list(span.get("balls", None) or [])
+    if not wire_list or len(wire_list) != len(span_points):
+        return False
+    topology = list(wire_geometry.wire_topology_key(settings))
+    for wire in wire_list:
+        if wire is None or list(wire.get("wire_topology", [])) != topology:
+            return False
+    ball_amount = settings.ball_amount if settings.balls_enabled else 0
+    if len(balls_list) != ball_amount*len(span_points) or None in balls_list:
+        return False
+    if ball_amount:
+        # ball radius is not part of topology, balls may need other shared mesh
+        ball_mesh = wire_mesh.get_ball_mesh(settings.ball_radius, settings.ball_sides, settings.ball_budget)
+    droop = wire_geometry.span_droop(settings)
+    if geometry is None:
+        geometry = get_spans_geometry([(span_points, settings)])[0] or [None]*len(span_points)
+    for wire_index, (wire, (start, end), parts) in enumerate(zip(wire_list, span_points, geometry)):
+        if wire.type == "CURVE":
+            constants = wire_geometry.span_constants(math.dist(start, end), droop, settings.catenary)
+            # only points are written, thickness is bevel of curve
+            if not wire_curve.set_curve_points(wire.data, start, end, settings, constants):
+                return False
+            wire_curve.set_curve_settings(wire.data, settings)
+            if ball_amount:
+                centers = wire_geometry.ball_positions(start, end, droop, ball_amount, settings.catenary, constants)
+        else:
+            # mesh wires always have parts (topology check makes sure wire and settings are both mesh)
+            vertices, edges, faces, centers = parts
+            # wire mesh was changed by hand, draw again
+            if len(wire.data.vertices) != len(vertices):
+                return False
+            wire_mesh.set_vertices(wire.data, vertices)
+        if ball_amount:
+            for ball, center in zip(balls_list[wire_index*ball_amount:(wire_index+1)*ball_amount], centers.tolist()):
+                ball.location = center
+                if ball.data != ball_mesh:
+                    old_mesh = ball.data
+                    ball.data = ball_mesh
+                    # shared mesh of old radius or sides is deleted with its last ball
+                    wire_mesh.remove_unused_meshes([old_mesh])
+    return True
+
 # gets objects returned from making wires and balls (lists)
-def get_returned_objects(wire_name, start_x, start_y, start_z, end_x, end_y, end_z, wire_list, balls_list):
+def get_returned_objects(wire_name, start_x, start_y, start_z, end_x, end_y, end_z, wire_list, balls_list, settings=None, geometry=None):
     # get active pole (only needed if balls where made to change selection back to poles)
     active_pole = bpy.context.active_object
 
     # returned list with wires and (possibly) balls
-    returned_list = choose_wire(wire_name, start_x, start_y, start_z, end_x, end_y, end_z)
+    returned_list = choose_wire(wire_name, start_x, start_y, start_z, end_x, end_y, end_z, settings, geometry)
     # add wires to wire_list
     wire_list.append(returned_list[0])
     # if wire balls were created
     if len(returned_list) > 1:
         # add wire balls to balls_list
         balls_list += returned_list[1]
-        # deselect balls
-        bpy.context.active_object.select_set(state=False)
-        # set active pole back to what it was before
-        bpy.context.view_layer.objects.active = active_pole
-        active_pole.select_set(state=True)
+        # deselect balls (no active object when drawing routes in background)
+        if active_pole is not None:
+            bpy.context.active_object.select_set(state=False)
+            # set active pole back to what it was before
+            bpy.context.view_layer.objects.active = active_pole
+            active_pole.select_set(state=True)
     
     # return lists (if balls not created, balls_list is empty)
     return wire_list, balls_list
 
+# gets start and end coordinates of wire from mushroom_index output of start pole to same input of end pole
+def get_span_coordinates(start_obj, end_obj, mushroom_index):
+    start = get_coordinates(start_obj, get_mushroom(start_obj.name)["output"][mushroom_index])
+    end = get_coordinates(end_obj, get_mushroom(end_obj.name)["input"][mushroom_index])
+    return tuple(start), tuple(end)
+
+# gets start and end coordinates of every wire between start and end poles (one for each mushroom)
+def get_pole_span_points(start_obj, end_obj):
+    return [get_span_coordinates(start_obj, end_obj, mushroom_index) for mushroom_index in range(len(get_mushroom(start_obj.name)["output"]))]
+
+# draws wires (and balls) of span for span_points (start, end) of each wire and saves them in registry
+# geometry can be span_parts of every wire already worked out (together with other wires)
+def draw_span(span_id, span_points, settings=None, geometry=None):
+    span = wire_registry.get_span(span_id)
+    # name of wire is the name of the poles it connects
+    wire_name = f"{span['start'].name}-{span['end'].name}"
+    wire_list = []
+    balls_list = []
+    if settings is None:
+        settings = get_wire_settings()
+    if geometry is None:
+        geometry = get_spans_geometry([(span_points, settings)])[0] or [None]*len(span_points)
+    for ((start_x, start_y, start_z), (end_x, end_y, end_z)), parts in zip(span_points, geometry):
+        # get wires and (potentially) balls (balls_list empty if no balls)
+        wire_list, balls_list = get_returned_objects(wire_name, start_x, start_y, start_z, end_x, end_y, end_z, wire_list, balls_list, settings, parts)
+    # wires and balls are saved in span to know what to delete when redrawing
+    wire_registry.set_span_objects(span_id, wire_list, balls_list)
+
+# gets amount of processes to work out wire geometry with (0 if parallel geometry is off)
+def get_pool_workers():
+    wire_config = bpy.context.scene.wire_config
+    if not wire_config.parallel_geometry:
+        return 0
+    return wire_config.parallel_workers or os.cpu_count() or 1
+
+# gets span_parts of wires (start, end, settings) from geometry cache and process pool
+# (only spans missing from cache are worked out, wires with same settings are worked out together)
+def get_wire_parts(tasks):
+    wire_config = bpy.context.scene.wire_config
+    workers = get_pool_workers()
+    def compute(missing):
+        # works out spans on main thread when there is no pool or too few spans for it
+        return wire_pool.compute_spans(missing, workers, wire_config.parallel_min_spans)
+    if wire_config.geometry_cache:
+        return wire_cache.get_parts(tasks, compute, wire_config.cache_precision, wire_config.cache_size*2**20)
+    return compute(tasks)
+
+# works out geometry of wires of all spans [(span_points, settings)] together (from cache and in process pool)
+# returns span_parts of every wire for each span (None for spans of curve wires, which are drawn from points)
+def get_spans_geometry(spans):
+    tasks = [(start, end, settings) for span_points, settings in spans if not settings.curve_type for start, end in span_points]
+    parts = iter(get_wire_parts(tasks))
+    return [None if settings.curve_type else [next(parts) for span in span_points] for span_points, settings in spans]
+
+# checks if all wires of object are drawn by geometry nodes (they follow pole with no python)
+def is_procedural_pole(obj):
+    span_ids = wire_registry.get_object_span_ids(obj)
+    if not span_ids:
+        return False
+    for span_id in span_ids:
+        net_obj = wire_registry.get_span(span_id).get("network", None)
+        if net_obj is None or not net_obj.get("wire_procedural", False):
+            return False
+    return True
+
+# saves network and index of every wire of it in span of registry the wire belongs to ("network_spans")
+# so wires of moved poles are found from their spans without looking through whole network
+def index_network(net_obj, spans):
+    span_indices = {}
+    for index, (start_obj, end_obj, mushroom_index) in enumerate(spans):
+        span_id = wire_registry.find_span(start_obj, end_obj)
+        if span_id is not None:
+            span_indices.setdefault(span_id, []).append(index)
+    for span_id, indices in span_indices.items():
+        span = wire_registry.get_span(span_id)
+        span["network"] = net_obj
+        span["network_spans"] = indices
+
+# draws all wires of network again for spans (start_obj, end_obj, mushroom_index)
+def fill_network(net_obj, spans, settings):
+    span_points = [get_span_coordinates(*span) for span in spans]
+    if net_obj.get("wire_procedural", False):
+        wire_nodes.fill_network(net_obj, spans, span_points, settings)
+    else:
+        parts = get_wire_parts([(start, end, settings) for start, end in span_points])
+        wire_network.fill_network(net_obj, spans, span_points, settings, parts)
+    # wires of spans before them may have been left out
+    index_network(net_obj, spans)
+
+# fills procedural networks again without wires of poles that were deleted (their hooks lost their pole)
+# other networks find deleted poles when wires connected to them are updated
+def update_deleted_poles():
+    settings = None
+    # list as networks with no wires left are deleted while looking
+    for net_obj in list(bpy.context.scene.objects):
+        if not net_obj.get("wire_procedural", False):
+            continue
+        if all(modifier.object is not None for modifier in net_obj.modifiers if modifier.type == "HOOK"):
+            continue
+        remaining = [span for span in wire_network.get_spans(net_obj) if span[0] is not None and span[1] is not None]
+        if not remaining:
+            wire_network.remove_network(net_obj)
+            continue
+        if settings is None:
+            settings = get_wire_settings()
+        fill_network(net_obj, remaining, settings)
+
+# draws wires of spans into one network mesh object
+def draw_network(span_ids):
+    spans = []
+    network_spans = {}
+    for span_id in span_ids:
+        span = wire_registry.get_span(span_id)
+        for mushroom_index in range(len(get_mushroom(span["start"].name)["output"])):
+            network_spans.setdefault(span_id, []).append(len(spans))
+            spans.append((span["start"], span["end"], mushroom_index))
+    if not spans:
+        return
+    span_points = [get_span_coordinates(*span) for span in spans]
+    name = f"wire_network_{spans[0][0].name}"
+    settings = get_wire_settings()
+    if bpy.context.scene.wire_config.procedural_network:
+        net_obj = wire_nodes.build_network(name, spans, span_points, settings)
+    else:
+        parts = get_wire_parts([(start, end, settings) for start, end in span_points])
+        net_obj = wire_network.build_network(name, spans, span_points, settings, parts)
+    for span_id, indices in network_spans.items():
+        span = wire_registry.get_span(span_id)
+        span["network"] = net_obj
+        span["network_spans"] = indices
+
+# rewrites wires of spans drawn in network meshes
+# only wires of spans are looked at (found from "network_spans" of span), not whole network
+def update_networks(span_ids, settings=None):
+    if settings is None:
+        settings = get_wire_settings()
+    # group spans by network they are in
+    networks = {}
+    for span_id in span_ids:
+        span = wire_registry.get_span(span_id)
+        net_obj = span.get("network", None)
+        if net_obj is not None:
+            networks.setdefault(net_obj.name, (net_obj, []))[1].append(span)
+    for net_obj, net_spans in networks.values():
+        # poles of span that were deleted leave None in span, network is filled again without its wires
+        if all(span.get("start", None) is not None and span.get("end", None) is not None and "network_spans" in span for span in net_spans):
+            # geometry nodes move wires with poles, only settings are given to them
+            if net_obj.get("wire_procedural", False):
+                wire_nodes.set_network_inputs(net_obj, settings)
+                continue
+            span_indices = []
+            span_points = []
+            for span in net_spans:
+                span_indices += list(span["network_spans"])
+                span_points += get_pole_span_points(span["start"], span["end"])
+            # pole got other amount of mushrooms
+            if len(span_indices) == len(span_points):
+                parts = get_wire_parts([(start, end, settings) for start, end in span_points])
+                if wire_network.update_spans(net_obj, span_indices, span_points, settings, parts):
+                    continue
+        # settings changed amount of vertices or poles were deleted, fill whole network again
+        spans = wire_network.get_spans(net_obj)
+        valid_spans = [span for span in spans if span[0] is not None and span[1] is not None]
+        fill_network(net_obj, valid_spans, settings)
+
 # gets selected objects and draws wires using above functions
 class WireMain(bpy.types.Operator):
     bl_idname = "wire_ops.draw_parabolic"
@@ -571,46 +509,76 @@ class WireMain(bpy.types.Operator):
 
     # draw wires first time
     def execute(self, context):
+        with wire_stats.measure("draw operator"):
+            self.draw_wires()
+        return {"FINISHED"}
+
+    def draw_wires(self):
         #context = bpy.context.scene
         selected_poles = get_selected_poles()
         #print(selected_poles) #<-- debug
-        # go through selected poles and set downstream (entering wire) and upstream (exiting wire) for poles
-        for pole_idx in range(len(selected_poles)-1):
-            selected_poles[pole_idx]["upstream"] = selected_poles[pole_idx+1]
-            selected_poles[pole_idx+1]["downstream"] = selected_poles[pole_idx]
-
-        # what is start pole and what is end pole
-        for obj in selected_poles:
-            #print(f'{obj.name} upstream: {obj.get("upstream", None)} downstream: {obj.get("downstream", None)}')
-            start_pole = obj.name
-            end_obj = (obj.get("upstream", None))
-            if end_obj:
-                end_pole = end_obj.name
-            else:
-                # no upstream pole, so this is the last pole
-                print(f"no upstream pole for {obj.name}")
-                break
-            # delete existing wires
-            remove_existing_wires(obj, end_obj)
-
-            wire_list = []
-            balls_list = []
+        # spans between poles one after another in selection (poles can also have spans to other poles)
+        span_ids = [wire_registry.add_span(obj, end_obj) for obj, end_obj in zip(selected_poles, selected_poles[1:])]
+        # delete wires drawn before between these poles
+        clear_spans(span_ids)
+        # draw all wires in one object
+        if bpy.context.scene.wire_config.network_mesh:
+            draw_network(span_ids)
+            return
+
+        spans = []
+        for span_id in span_ids:
+            span = wire_registry.get_span(span_id)
             # get start and end coordinates for each mushroom in the pole
-            for mushroom_index, mushroom in enumerate(get_mushroom(start_pole)["output"]):
-                start_x, start_y, start_z = get_coordinates(obj, mushroom)
-                end_x, end_y, end_z = get_coordinates(end_obj, get_mushroom(end_pole)["input"][mushroom_index])
-                # name of wire is the name of the poles it connects
-                wire_name = f"{start_pole}-{end_pole}"
-                # get wires and (potentially) balls (balls_list empty if no balls)
-                # wires and balls are added to blender objects as custom properties to know what to delete when redrawing
-                wire_list, balls_list = get_returned_objects(wire_name, start_x, start_y, start_z, end_x, end_y, end_z, wire_list, balls_list)
-            # add wire_list to start and end poles
-            obj["output_wire"] = wire_list
-            end_obj["input_wire"] = wire_list
-            # add wire balls to start and end poles if enabled
-            obj["output_wire_balls"] = balls_list
-            end_obj["input_wire_balls"] = balls_list
+            span_points = get_pole_span_points(span["start"], span["end"])
+            # less detail for wires far from camera
+            spans.append((span_points, get_pair_settings(get_wire_settings(), span_points)))
+        # geometry of all spans is worked out together (in process pool if parallel geometry is on)
+        for span_id, (span_points, settings), geometry in zip(span_ids, spans, get_spans_geometry(spans)):
+            draw_span(span_id, span_points, settings, geometry)
+
+# draws wires of all routes {route name: [poles in order]} in one pass
+# mushrooms of every pole are looked up and moved to world coordinates once, not for every wire
+def draw_routes(route_poles):
+    mushrooms = {}
+    route_spans = {}
+    for route, poles in route_poles.items():
+        poles = [obj for obj in poles if is_pole(obj)]
+        for obj in poles:
+            if obj.name not in mushrooms:
+                mushroom = get_mushroom(obj.name)
+                mushrooms[obj.name] = {key: [tuple(get_coordinates(obj, co)) for co in mushroom.get(key, ())] for key in ("input", "output")}
+        route_spans[route] = [wire_registry.add_span(obj, end_obj) for obj, end_obj in zip(poles, poles[1:])]
+    # one network mesh for every route
+    if bpy.context.scene.wire_config.network_mesh:
+        for span_ids in route_spans.values():
+            draw_network(span_ids)
+        return
+    settings = get_wire_settings()
+    span_ids = [span_id for route_span_ids in route_spans.values() for span_id in route_span_ids]
+    spans = []
+    for span_id in span_ids:
+        span = wire_registry.get_span(span_id)
+        span_points = list(zip(mushrooms[span["start"].name]["output"], mushrooms[span["end"].name]["input"]))
+        # less detail for wires far from camera
+        spans.append((span_points, get_pair_settings(settings, span_points)))
+    # geometry of all routes is worked out together (in process pool if parallel geometry is on)
+    for span_id, (span_points, pair_settings), geometry in zip(span_ids, spans, get_spans_geometry(spans)):
+        draw_span(span_id, span_points, pair_settings, geometry)
+
+# places poles from csv or json file of routes and draws wires between them
+class BuildRoutes(bpy.types.Operator, ImportHelper):
+    bl_idname = "wire_ops.build_routes"
+    bl_label = "Build Routes"
+    bl_description = "Places poles of routes from csv or json file and draws wires between them"
+    bl_options = {"REGISTER"}
 
+    filter_glob : bpy.props.StringProperty(default="*.csv;*.json", options={"HIDDEN"})
+
+    def execute(self, context):
+        route_poles = wire_routes.place_poles(wire_routes.read_routes(self.filepath))
+        draw_routes(route_poles)
+        print(f"built {len(route_poles)} routes with {sum(len(poles) for poles in route_poles.values())} poles")
         return {"FINISHED"}
 
 # removes wire properties from selected poles
@@ -623,18 +591,12 @@ class RemoveWireProps(bpy.types.Operator):
     bl_options = {"REGISTER"}
 
     def execute(self, context):
-        context = bpy.context.scene
-        selected_poles = [obj for obj in bpy.context.selected_objects]
-        for pole in selected_poles:
-            # remove upstream property
-            if pole.get("upstream", None) is not None:
-                del pole["upstream"]
-            # remove downstream property
-            if pole.get("downstream", None) is not None:
-                del pole["downstream"]
-            # delete input and output wire objects and properties
-            remove_existing_wires(pole, pole)
-        print("removed upstream and downstream properties")
+        # delete wires of selected objects and remove their spans from registry
+        span_ids = wire_registry.get_connected_span_ids(bpy.context.selected_objects)
+        clear_spans(span_ids)
+        for span_id in span_ids:
+            wire_registry.remove_span(span_id)
+        print("removed wires and spans of selected objects")
         return {"FINISHED"}
 
 # manually update wire
@@ -647,49 +609,55 @@ class ManualUpdateWire(bpy.types.Operator):
     bl_options = {"REGISTER"}
 
     def execute(self, context):
+        update_deleted_poles()
         update_wire()
         update_wire_between_verts()
         return {"FINISHED"}
 
+# checks if object was connected to other objects with wires
+def has_wires(obj):
+    return wire_registry.has_spans(obj)
+
 # function updates normal wires (delete old wires and drawn new at new location)
-def update_wire():
+# poles is list of poles that moved, selected poles are used if not given
+# settings can be given to draw with other settings than wire config (preview)
+def update_wire(poles=None, settings=None):
     #print('update wire') #<-- debug
-    # get selected poles
-    selected_poles = get_selected_poles()
-    using_poles = []
-    for obj in selected_poles:
-        # upstream wires
-        start_obj = obj
-        end_obj = (obj.get("upstream", None))
-        using_poles.append((start_obj, end_obj))
-        # downstream wires
-        start_obj = (obj.get("downstream", None))
-        end_obj = obj
-        using_poles.append((start_obj, end_obj))
-    for start_obj, end_obj in using_poles:
-        wire_list = []
-        balls_list = []
-        # make sure start and end poles exist
-        # also need to make sure get_mushroom does not return None for both objects otherwise wire will not update and throw exception
-        if (end_obj and start_obj and (get_mushroom(start_obj.name) and get_mushroom(end_obj.name))) is not None:
-            # delete old wires
-            remove_existing_wires(start_obj, end_obj)
-            # draw new wires
-            for mushroom_index, mushroom in enumerate(get_mushroom(start_obj.name)["output"]):
-                start_x, start_y, start_z = get_coordinates(start_obj, mushroom)
-                end_x, end_y, end_z = get_coordinates(end_obj, get_mushroom(end_obj.name)["input"][mushroom_index])
-                # update wire
-                wire_name = f"{start_obj.name}-{end_obj.name}"
-                # get wires and (potentially) balls (balls_list empty if no balls)
-                wire_list, balls_list = get_returned_objects(wire_name, start_x, start_y, start_z, end_x, end_y, end_z, wire_list, balls_list)
-            end_obj["input_wire"] = wire_list
-            start_obj["output_wire"] = wire_list
-            # add wire balls to start and end poles if enabled
-            start_obj["output_wire_balls"] = balls_list
-            end_obj["input_wire_balls"] = balls_list
-        else:
-            #print('end_obj is None') #<-- debug
-            pass
+    if poles is None:
+        # get selected poles
+        poles = get_selected_poles()
+    else:
+        poles = [obj for obj in poles if is_pole(obj)]
+    if settings is None:
+        settings = get_wire_settings()
+    # spans of moved poles from registry, each span once even if both its poles moved
+    span_ids = wire_registry.get_connected_span_ids(poles)
+    # wires drawn in network meshes only rewrite their vertices
+    update_networks(span_ids, settings)
+    updated_ids = []
+    spans = []
+    for span_id in span_ids:
+        span = wire_registry.get_span(span_id)
+        start_obj = span.get("start", None)
+        end_obj = span.get("end", None)
+        # wire between vertices or already updated with network mesh
+        if "start_vector" in span or span.get("network", None) is not None:
+            continue
+        # make sure start and end poles exist and are in pole library
+        if start_obj is None or end_obj is None or get_mushroom(start_obj.name) is None or get_mushroom(end_obj.name) is None:
+            continue
+        span_points = get_pole_span_points(start_obj, end_obj)
+        # less detail for wires far from camera
+        updated_ids.append(span_id)
+        spans.append((span_points, get_pair_settings(settings, span_points)))
+    # geometry of all spans is worked out together (in process pool if parallel geometry is on)
+    for span_id, (span_points, pair_settings), geometry in zip(updated_ids, spans, get_spans_geometry(spans)):
+        # move existing wires if settings did not change their vertices
+        if rewrite_wires(span_id, span_points, pair_settings, geometry):
+            continue
+        # delete old wires and draw new wires
+        wire_registry.remove_span_objects(span_id)
+        draw_span(span_id, span_points, pair_settings, geometry)
 
 # draw wire between two vertices selected in edit mode
 class WireBetweenVertices(bpy.types.Operator):
@@ -724,93 +692,68 @@ class WireBetweenVertices(bpy.types.Operator):
             print("no vertices found/selected")
             return {"CANCELLED"}
         
-        for obj_idx in range(len(selected_verts)-1):
-            # set upstream and downstream objects
-            selected_verts[obj_idx][1]["upstream"] = selected_verts[obj_idx+1][1]
-            selected_verts[obj_idx+1][1]["downstream"] = selected_verts[obj_idx][1]
-
-        # make wire
-        wire_list = []
-        balls_list = []
-        for obj in selected_verts:
-            # find next object in list
-            try:
-                next_obj = selected_verts[selected_verts.index(obj)+1]
-            except IndexError:
-                print("no next object")
-                break
-            # get coordinates
-            #start_x, start_y, start_z = obj[0]
-            start_vec = obj[0]
-            start_obj = obj[1]
-            start_x, start_y, start_z = (start_obj.matrix_world @ start_vec).to_tuple()
-            #end_x, end_y, end_z = next_obj[0]
-            end_vec = next_obj[0]
-            end_obj = next_obj[1]
-            end_x, end_y, end_z = (end_obj.matrix_world @ end_vec).to_tuple()
+        # make wire from every vertex to next one
+        for (start_vec, start_obj), (end_vec, end_obj) in zip(selected_verts, selected_verts[1:]):
             #print(f'{start_obj.name} to {end_obj.name}') #<-- debug
-            wire_name = f"{start_obj.name}-{end_obj.name}"
-            # draw wire
-            # get wires and (potentially) balls (balls_list empty if no balls)
-            wire_list, balls_list = get_returned_objects(wire_name, start_x, start_y, start_z, end_x, end_y, end_z, wire_list, balls_list)
-    
-        # add wires to objets
-        start_obj["output_wire"] = wire_list
-        end_obj["input_wire"] = wire_list
-        # add vector
-        start_obj["start_vector"] = start_vec
-        end_obj["end_vector"] = end_vec
-        # balls
-        start_obj["output_wire_balls"] = balls_list
-        end_obj["input_wire_balls"] = balls_list
+            # vectors are saved in span to draw wire when object moves
+            span_id = wire_registry.add_span(start_obj, end_obj, start_vec, end_vec)
+            # delete wire drawn before between these objects
+            clear_spans([span_id])
+            span_points = [((start_obj.matrix_world @ start_vec).to_tuple(), (end_obj.matrix_world @ end_vec).to_tuple())]
+            draw_span(span_id, span_points)
         return {"FINISHED"}
 
-def update_wire_between_verts():
-    # getting selected objects
-    selected_objects = []
-    if bpy.context.selected_objects != []:
-        for obj in bpy.context.selected_objects:
-            # upstream
-            start_obj = obj
-            start_vec = start_obj.get("start_vector", None)
-            end_obj = (obj.get("upstream", None))
-            selected_objects.append((start_obj, end_obj))
-            # downstream
-            start_obj = (obj.get("downstream", None))
-            end_obj = obj
-            end_vec = end_obj.get("end_vector", None)
-            selected_objects.append((start_obj, end_obj))
-    else:
-        print("no objects selected")
-    
-    for start_obj, end_obj in selected_objects:
-        wire_list = []
-        balls_list = []
-        if (end_obj and start_obj) is not None:
-            start_property_arr = start_obj.get("start_vector", None)
-            if start_property_arr is None:
-                break
-            start_vec = mathutils.Vector((start_property_arr[0], start_property_arr[1], start_property_arr[2]))
-            end_property_arr = end_obj.get("end_vector", None)
-            end_vec = mathutils.Vector((end_property_arr[0], end_property_arr[1], end_property_arr[2]))
-            #print(start_vec, end_vec) #<-- debug
-            # delete old wires
-            remove_existing_wires(start_obj, end_obj)
-            # draw new wires from start_vec to end_vec
-            start_x, start_y, start_z = (start_obj.matrix_world @ start_vec).to_tuple()
-            end_x, end_y, end_z = (end_obj.matrix_world @ end_vec).to_tuple()
-            # update wire
-            wire_name = f"{start_obj.name}-{end_obj.name}"
-            # get wires and (potentially) balls (balls_list empty if no balls)
-            wire_list, balls_list = get_returned_objects(wire_name, start_x, start_y, start_z, end_x, end_y, end_z, wire_list, balls_list)
-            # update properties
-            end_obj["input_wire"] = wire_list
-            start_obj["output_wire"] = wire_list
-            # update vector
-            start_obj["start_vector"] = start_vec
-            end_obj["end_vector"] = end_vec
-            # update balls
-            start_obj["output_wire_balls"] = balls_list
-            end_obj["input_wire_balls"] = balls_list
-        else:
-            pass
\ No newline at end of file
+# objects is list of objects that moved, selected objects are used if not given
+# settings can be given to draw with other settings than wire config (preview)
+def update_wire_between_verts(objects=None, settings=None):
+    if objects is None:
+        # getting selected objects
+        objects = bpy.context.selected_objects
+        if not objects:
+            print("no objects selected")
+    if settings is None:
+        settings = get_wire_settings()
+
+    for span_id in wire_registry.get_connected_span_ids(objects):
+        span = wire_registry.get_span(span_id)
+        start_obj = span.get("start", None)
+        end_obj = span.get("end", None)
+        # wire not drawn between vertices
+        if start_obj is None or end_obj is None or "start_vector" not in span:
+            continue
+        start_vec = mathutils.Vector(span["start_vector"])
+        end_vec = mathutils.Vector(span["end_vector"])
+        #print(start_vec, end_vec) #<-- debug
+        span_points = [((start_obj.matrix_world @ start_vec).to_tuple(), (end_obj.matrix_world @ end_vec).to_tuple())]
+        # less detail for wires far from camera
+        pair_settings = get_pair_settings(settings, span_points)
+        # move existing wire if settings did not change its vertices
+        if rewrite_wires(span_id, span_points, pair_settings):
+            continue
+        # delete old wire and draw new wire from start_vec to end_vec
+        wire_registry.remove_span_objects(span_id)
+        draw_span(span_id, span_points, pair_settings)
+
+# names of objects moved since wires were last drawn at full resolution and when they last moved
+pending_update = {"names": set(), "last_move": 0.0, "delay": 0.5}
+
+# draws full resolution wires for moved objects once they stopped moving for delay seconds
+def schedule_full_update(objects, delay):
+    pending_update["names"].update(obj.name for obj in objects)
+    pending_update["last_move"] = time.monotonic()
+    pending_update["delay"] = delay
+    if not bpy.app.timers.is_registered(run_full_update):
+        bpy.app.timers.register(run_full_update, first_interval=delay)
+
+# timer that draws full resolution wires (returns seconds until it runs again, None to stop)
+def run_full_update():
+    waited = time.monotonic() - pending_update["last_move"]
+    if waited < pending_update["delay"]:
+        # objects moved again, wait until they stop
+        return pending_update["delay"] - waited
+    objects = [bpy.data.objects.get(name) for name in pending_update["names"]]
+    objects = [obj for obj in objects if obj is not None]
+    pending_update["names"].clear()
+    update_wire(objects)
+    update_wire_between_verts(objects)
+    return None
@@ -1,6 +1,12 @@
 import bpy
+import base64
+import collections.abc
+import functools
 import json
 import os
+import struct
+import time
+import zlib
 
 # makes input for pole (wires ENTERING pole)
 class CreatePoleInput(bpy.types.Operator):
@@ -34,7 +40,19 @@ class PrintPoles(bpy.types.Operator):
     bl_options = {"REGISTER"}
 
     def execute(self, context):
-        print(PolesDict().poles)
+        print(dict(PolesDict().poles))
+        return {"FINISHED"}
+
+# saves poles used in scene into .blend file so shared pole library is not needed to load it
+class EmbedPoles(bpy.types.Operator):
+    bl_idname = "wire_pole.embed_poles"
+    bl_label = "Embed Poles"
+    bl_description = "Saves poles used in scene into .blend file"
+    bl_options = {"REGISTER"}
+
+    def execute(self, context):
+        names = {obj.name.split('.')[0] for obj in context.scene.objects}
+        PolesDict().embed_poles(names)
         return {"FINISHED"}
 
 class DeletePole(bpy.types.Operator):
@@ -52,33 +70,212 @@ class DeletePole(bpy.types.Operator):
         return {"FINISHED"}
 
 
+# pole library is stored in "poles" directory next to this file:
+# - index.json has name of every pole and which shard file it is in
+# - shard_XX.json files have poles, coordinates packed as base64 of little endian doubles
+# only index is read to check if pole exists, shards are read when pole in them is used
+# and changing a pole only writes its shard (and index if pole is new)
+# old poles.json is imported into library the first time library is used
+# poles can also be embedded in .blend file (scene "wire_poles" property), these are used before library
+LIBRARY_SHARDS = 64
+
+# json files read by pole library are shared so files are not read on every lookup
+# file is read again only when its modification time or size changes
+# (checked at most every JSON_CHECK_INTERVAL seconds, files can be on slow network drive)
+JSON_CHECK_INTERVAL = 1.0
+json_cache = {}
+
+# gets (modification time, size) of file or None if it does not exist
+def get_file_key(filepath):
+    try:
+        stat = os.stat(filepath)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+# gets contents of json file from cache, reading file if it changed (default if file does not exist)
+def load_json(filepath, default):
+    cached = json_cache.get(filepath)
+    now = time.monotonic()
+    if cached is not None and now - cached["checked"] < JSON_CHECK_INTERVAL:
+        return cached["data"] if cached["data"] is not None else default
+    key = get_file_key(filepath)
+    if cached is None or key != cached["key"]:
+        #print(f"read file {filepath}") #<-- debug
+        data = read_poles_file(filepath) if key is not None else None
+        cached = {"key": key, "data": data}
+        json_cache[filepath] = cached
+    cached["checked"] = now
+    return cached["data"] if cached["data"] is not None else default
+
+# writes json file (through temporary file so readers never see half written file) and updates cache
+def write_json(filepath, data, indent=None):
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    temp_path = f"{filepath}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(data, f, indent=indent)
+    os.replace(temp_path, filepath)
+    json_cache[filepath] = {"key": get_file_key(filepath), "data": data, "checked": time.monotonic()}
+
+# reads poles json file
+def read_poles_file(filepath):
+    with open(filepath, "r") as f:
+        poles = json.load(f)
+    return poles
+
+# packs coordinates [(x, y, z), ...] into base64 string of little endian doubles
+def pack_coordinates(coords):
+    flat = [float(value) for co in coords for value in co]
+    return base64.b64encode(struct.pack(f"<{len(flat)}d", *flat)).decode("ascii")
+
+# unpacks coordinates packed by pack_coordinates into ((x, y, z), ...)
+@functools.lru_cache(maxsize=4096)
+def unpack_coordinates(packed):
+    data = base64.b64decode(packed)
+    flat = struct.unpack(f"<{len(data)//8}d", data)
+    return tuple(flat[i:i+3] for i in range(0, len(flat), 3))
+
+# packs pole {"input": coords, "output": coords} for storing
+def pack_pole(pole):
+    return {key: pack_coordinates(coords) for key, coords in pole.items()}
+
+# unpacks pole packed by pack_pole
+def unpack_pole(packed):
+    return {key: unpack_coordinates(value) for key, value in packed.items()}
+
+# poles stored in library directory, used like dict of name -> {"input": coords, "output": coords}
+class PoleLibrary(collections.abc.MutableMapping):
+    def __init__(self, directory, legacy_path=None):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+        self.legacy_path = legacy_path
+
+    # gets index, importing old poles.json if library does not exist yet
+    def get_index(self):
+        index = load_json(self.index_path, None)
+        if index is None:
+            if self.legacy_path is not None and os.path.exists(self.legacy_path):
+                self.import_poles(read_poles_file(self.legacy_path))
+                return load_json(self.index_path, None)
+            return {"shards": LIBRARY_SHARDS, "poles": {}}
+        return index
+
+    # gets path of shard file
+    def get_shard_path(self, shard):
+        return os.path.join(self.directory, f"shard_{shard:02d}.json")
+
+    # writes many poles at once (each shard written once, index only if poles were added)
+    def import_poles(self, poles):
+        index = load_json(self.index_path, None)
+        # new library has no index yet
+        index_changed = index is None
+        if index is None:
+            index = {"shards": LIBRARY_SHARDS, "poles": {}}
+        shards = {}
+        for name, pole in poles.items():
+            shard = zlib.crc32(name.encode("utf-8")) % index["shards"]
+            if shard not in shards:
+                shards[shard] = load_json(self.get_shard_path(shard), {})
+            shards[shard][name] = pack_pole(pole)
+            if index["poles"].get(name, None) != shard:
+                index["poles"][name] = shard
+                index_changed = True
+        for shard, shard_poles in shards.items():
+            write_json(self.get_shard_path(shard), shard_poles)
+        if index_changed:
+            write_json(self.index_path, index)
+
+    # gets packed pole (coordinates as packed strings)
+    def get_packed(self, name):
+        index = self.get_index()
+        shard_poles = load_json(self.get_shard_path(index["poles"][name]), {})
+        return shard_poles[name]
+
+    def __getitem__(self, name):
+        return unpack_pole(self.get_packed(name))
+
+    def __setitem__(self, name, pole):
+        self.import_poles({name: pole})
+
+    def __delitem__(self, name):
+        index = self.get_index()
+        shard = index["poles"].pop(name)
+        shard_path = self.get_shard_path(shard)
+        shard_poles = load_json(shard_path, {})
+        shard_poles.pop(name, None)
+        write_json(shard_path, shard_poles)
+        write_json(self.index_path, index)
+
+    def __contains__(self, name):
+        return name in self.get_index()["poles"]
+
+    def __iter__(self):
+        return iter(list(self.get_index()["poles"]))
+
+    def __len__(self):
+        return len(self.get_index()["poles"])
+
+# pole library for directory, same object for all PolesDict so its cache is shared
+libraries = {}
+def get_library(directory, legacy_path=None):
+    if directory not in libraries:
+        libraries[directory] = PoleLibrary(directory, legacy_path)
+    return libraries[directory]
+
+# gets poles embedded in current .blend file or None
+def get_embedded_poles():
+    scene = bpy.context.scene
+    if scene is None:
+        return None
+    return scene.get("wire_poles", None)
+
+# poles embedded in .blend file, then poles in library
+class ScenePoles(collections.abc.Mapping):
+    def __init__(self, library, embedded):
+        self.library = library
+        self.embedded = embedded
+
+    def __getitem__(self, name):
+        if self.embedded is not None and name in self.embedded:
+            return unpack_pole(self.embedded[name])
+        return self.library[name]
+
+    def __contains__(self, name):
+        if self.embedded is not None and name in self.embedded:
+            return True
+        return name in self.library
+
+    def __iter__(self):
+        names = dict.fromkeys(self.embedded.keys() if self.embedded is not None else [])
+        names.update(dict.fromkeys(self.library))
+        return iter(names)
+
+    def __len__(self):
+        return len(list(iter(self)))
+
 class PolesDict():
-    # get poles.json path
     def __init__(self):
-        self.poles = {}
-        #print("read file") #<-- debug
-        # get path of current file to find json in same directory
-        self.json_path = os.path.join(os.path.dirname(__file__), "poles.json")
-        # read json if it exists
-        if os.path.exists(self.json_path):
-            self.poles = self.read_poles(self.json_path)
-    
-    # writes poles to poles.json
-    def dump_poles(self, poles, filepath):
-        with open(filepath, "w") as f:
-            json.dump(poles, f, indent=4)
-    
-    # reads poles.json
-    def read_poles(self, filepath):
-        with open(filepath, "r") as f:
-            poles = json.load(f)
-        return poles
-    
+        addon_dir = os.path.dirname(__file__)
+        # old single file library
+        self.json_path = os.path.join(addon_dir, "poles.json")
+        self.library = get_library(os.path.join(addon_dir, "poles"), self.json_path)
+        self.poles = ScenePoles(self.library, get_embedded_poles())
+
     def delete_pole(self, name):
-        if name in self.poles:
-            self.poles.pop(name)
-            # dump
-            self.dump_poles(self.poles, self.json_path)
+        if name in self.library:
+            del self.library[name]
+        embedded = get_embedded_poles()
+        if embedded is not None and name in embedded:
+            del embedded[name]
+
+    # saves packed poles with names into current .blend file
+    def embed_poles(self, names):
+        scene = bpy.context.scene
+        if scene.get("wire_poles", None) is None:
+            scene["wire_poles"] = {}
+        for name in names:
+            if name in self.library:
+                scene["wire_poles"][name] = self.library.get_packed(name)
 
     # gets currently s4elected vertices
     def get_vertices(self):
@@ -97,22 +294,14 @@ class PolesDict():
         # get selected object
         obj = bpy.context.active_object
         obj_name = obj.name.split('.')[0]
-        # check if pole with current name already exists
-        if obj_name in self.poles:
-            # if check_key exists, save it
-            if check_key in self.poles[obj_name]:
-                poles_check_key = self.poles[obj_name][check_key]
-            else:
-                poles_check_key = None
-            # delete entry for pole
-            self.poles.pop(obj_name)
-            # create new entry for pole with add_key
-            self.poles[obj_name] = {add_key: selected_verts}
-            # add check_key if previously existed
-            if poles_check_key:
-                self.poles[obj_name][check_key] = poles_check_key
-        # if pole does not exist create it with add_key
-        else:
-            self.poles[obj_name] = {add_key: selected_verts}
-        # dump poles
-        self.dump_poles(self.poles, self.json_path)
\ No newline at end of file
+        # create new entry for pole with add_key
+        pole = {add_key: selected_verts}
+        # add check_key if pole already exists with it
+        if obj_name in self.poles and check_key in self.poles[obj_name]:
+            pole[check_key] = self.poles[obj_name][check_key]
+        # only shard with this pole is written
+        self.library[obj_name] = pole
+        # keep embedded copy up to date
+        embedded = get_embedded_poles()
+        if embedded is not None and obj_name in embedded:
+            embedded[obj_name] = self.library.get_packed(obj_name)
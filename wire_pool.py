@@ -0,0 +1,172 @@
+import concurrent.futures
+import multiprocessing
+import os
+import numpy as np
+from multiprocessing import shared_memory
+from . import wire_geometry
+
+# works out geometry of many spans in a process pool so all cores are used
+# workers write packed vertex and index arrays of their spans into shared memory and main thread only reads them
+# (blender datablocks can only be made on main thread)
+# no bpy here, workers run plain python
+
+# pool is kept between calls so workers start only once
+# failed is True after pool could not be used, geometry is then worked out on main thread until plugin is enabled again
+# spans is amount of spans worked out in workers (to check pool is really used)
+pool_state = {"executor": None, "workers": 0, "failed": False, "spans": 0}
+
+# most spans sent to worker in one task
+CHUNK_SPANS = 64
+
+# workers can not import plugin package (its __init__ imports bpy, which workers do not have)
+# so package is made as empty module pointing at plugin directory before any task is unpickled,
+# then modules of package that do not need bpy (wire_geometry, wire_pool) are imported normally
+WORKER_SETUP = """
+import sys, types
+if {package!r} not in sys.modules:
+    package = types.ModuleType({package!r})
+    package.__path__ = [{path!r}]
+    sys.modules[{package!r}] = package
+"""
+
+# gets pool with workers processes (pool with other amount of workers is shut down)
+def get_executor(workers):
+    executor = pool_state["executor"]
+    if executor is not None and pool_state["workers"] == workers:
+        return executor
+    shutdown()
+    setup = WORKER_SETUP.format(package=__package__, path=os.path.dirname(os.path.abspath(__file__)))
+    # spawn new processes, forking blender is not safe
+    executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=exec,
+        initargs=(setup, {}),
+    )
+    pool_state["executor"] = executor
+    pool_state["workers"] = workers
+    return executor
+
+# stops workers of pool (pool is started again when needed)
+def shutdown():
+    if pool_state["executor"] is not None:
+        pool_state["executor"].shutdown(wait=False, cancel_futures=True)
+    pool_state["executor"] = None
+    pool_state["workers"] = 0
+    pool_state["failed"] = False
+
+# gets arrays in shared memory block for totals (vertices, edges, loops, faces, centers) of all spans in it
+# returns [vertices, centers, edges, loops, sizes] (float64 first so every array is aligned)
+def block_arrays(buffer, totals):
+    vertex_count, edge_count, loop_count, face_count, center_count = totals
+    shapes = [
+        (np.float64, (vertex_count, 3)),
+        (np.float64, (center_count, 3)),
+        (np.int32, (edge_count, 2)),
+        (np.int32, (loop_count,)),
+        (np.int32, (face_count,)),
+    ]
+    arrays = []
+    offset = 0
+    for dtype, shape in shapes:
+        array = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+        offset += array.nbytes
+        arrays.append(array)
+    return arrays
+
+# gets size in bytes of shared memory block for totals
+def block_size(totals):
+    vertex_count, edge_count, loop_count, face_count, center_count = totals
+    return 8*3*(vertex_count + center_count) + 4*(2*edge_count + loop_count + face_count)
+
+# runs in worker, works out span_parts of tasks (start, end, settings) and packs them into new shared memory block
+# returns name of block and (vertices, edges, loops, faces, centers) of every span
+def compute_chunk(tasks):
+    parts = wire_geometry.spans_parts(tasks)
+    counts = [(len(vertices), len(edges), len(faces[0]), len(faces[1]), len(centers)) for vertices, edges, faces, centers in parts]
+    totals = np.sum(counts, axis=0, dtype=np.int64).tolist()
+    # block can not be empty
+    block = shared_memory.SharedMemory(create=True, size=max(block_size(totals), 1))
+    try:
+        vertices, centers, edges, loops, sizes = block_arrays(block.buf, totals)
+        vertices[:] = np.concatenate([part[0] for part in parts])
+        centers[:] = np.concatenate([part[3] for part in parts])
+        edges[:] = np.concatenate([part[1] for part in parts])
+        loops[:] = np.concatenate([part[2][0] for part in parts])
+        sizes[:] = np.concatenate([part[2][1] for part in parts])
+        # block can only be closed when no arrays use it
+        del vertices, centers, edges, loops, sizes
+    except Exception:
+        # block is never sent to main thread, free it here
+        block.close()
+        block.unlink()
+        raise
+    name = block.name
+    block.close()
+    return name, counts
+
+# reads spans packed by compute_chunk and frees block, returns span_parts of every span
+def read_chunk(name, counts):
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        totals = np.sum(counts, axis=0, dtype=np.int64).tolist()
+        # one copy of every array, spans are views into copies
+        arrays = [array.copy() for array in block_arrays(block.buf, totals)]
+    finally:
+        block.close()
+        block.unlink()
+    vertices, centers, edges, loops, sizes = arrays
+    # where every span starts in arrays
+    starts = np.cumsum([(0, 0, 0, 0, 0)] + counts[:-1], axis=0)
+    parts = []
+    for (vertex_start, edge_start, loop_start, face_start, center_start), (vertex_count, edge_count, loop_count, face_count, center_count) in zip(starts.tolist(), counts):
+        parts.append((
+            vertices[vertex_start:vertex_start+vertex_count],
+            edges[edge_start:edge_start+edge_count],
+            (loops[loop_start:loop_start+loop_count], sizes[face_start:face_start+face_count]),
+            centers[center_start:center_start+center_count],
+        ))
+    return parts
+
+# frees block of chunk that was not read (chunk is cancelled if it did not start yet)
+def free_chunk(future):
+    if future.cancel():
+        return
+    try:
+        name, counts = future.result()
+        block = shared_memory.SharedMemory(name=name)
+    except Exception:
+        # chunk failed (and made no block) or block was already freed
+        return
+    block.close()
+    block.unlink()
+
+# gets span_parts of every task (start, end, settings) using pool of workers processes
+# tasks are worked out on main thread if there are fewer than min_spans of them or pool can not be used
+def compute_spans(tasks, workers, min_spans=0):
+    if workers < 2 or len(tasks) < max(min_spans, 2) or pool_state["failed"]:
+        return wire_geometry.spans_parts(tasks)
+    # small enough chunks that every worker gets several (work is shared out evenly)
+    chunk_spans = min(CHUNK_SPANS, max(1, len(tasks)//(workers*4)))
+    chunks = [tasks[i:i+chunk_spans] for i in range(0, len(tasks), chunk_spans)]
+    futures = []
+    read = 0
+    try:
+        executor = get_executor(workers)
+        futures = [executor.submit(compute_chunk, chunk) for chunk in chunks]
+        parts = []
+        for future in futures:
+            # counted before reading as read_chunk frees block even if it fails
+            read += 1
+            parts += read_chunk(*future.result())
+        pool_state["spans"] += len(parts)
+        return parts
+    except Exception as error:
+        print(f"could not use process pool ({error!r}), working out geometry on main thread")
+        shutdown()
+        pool_state["failed"] = True
+        return wire_geometry.spans_parts(tasks)
+    finally:
+        # blocks of chunks after failed one are freed (waits for chunks that are running)
+        for future in futures[read:]:
+            free_chunk(future)
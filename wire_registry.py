@@ -0,0 +1,137 @@
+import bpy
+from . import wire_mesh
+
+# span registry keeps every pair of poles (or objects for wire between vertices) connected with wires
+# scene "wire_spans" has span id -> {"start": obj, "end": obj, "wires": [objs], "balls": [objs]}
+# with "start_vector"/"end_vector" for wire between vertices and "network" for spans drawn in network mesh
+# (with "network_spans", index of every wire of span in network)
+# every connected object has "wire_spans" with ids of its spans, so spans of moved objects are found
+# without looking at other objects, and an object can have any amount of spans (branching lines, many lines through one pole)
+
+# gets registry of current scene
+def get_registry():
+    scene = bpy.context.scene
+    if scene.get("wire_spans", None) is None:
+        scene["wire_spans"] = {}
+    return scene["wire_spans"]
+
+# gets span with id or None
+def get_span(span_id):
+    return get_registry().get(span_id, None)
+
+# gets new span id (ids are never used again)
+def new_span_id():
+    scene = bpy.context.scene
+    counter = scene.get("wire_span_counter", 0) + 1
+    scene["wire_span_counter"] = counter
+    return str(counter)
+
+# gets ids of spans starting or ending at object
+def get_object_span_ids(obj):
+    migrate_legacy(obj)
+    span_ids = obj.get("wire_spans", None)
+    if span_ids is None:
+        return []
+    # spans removed from registry while object was not there (undo, deleted object) are left out
+    registry = get_registry()
+    return [span_id for span_id in span_ids.keys() if span_id in registry]
+
+# gets ids of spans of objects, each span only once even if both its objects are in objects
+def get_connected_span_ids(objects):
+    return list(dict.fromkeys(span_id for obj in objects for span_id in get_object_span_ids(obj)))
+
+# checks if object has spans
+def has_spans(obj):
+    return bool(obj.get("wire_spans", None)) or "upstream" in obj or "downstream" in obj
+
+# gets id of span from start_obj to end_obj or None
+# wires between vertices are also found by their vectors, so objects can have many of them between each other
+def find_span(start_obj, end_obj, start_vector=None, end_vector=None):
+    registry = get_registry()
+    vectors = None if start_vector is None else (list(start_vector), list(end_vector))
+    span_ids = start_obj.get("wire_spans", None)
+    for span_id in (span_ids.keys() if span_ids is not None else []):
+        span = registry.get(span_id, None)
+        if span is None or span.get("start", None) != start_obj or span.get("end", None) != end_obj:
+            continue
+        span_vectors = None
+        if "start_vector" in span:
+            span_vectors = (list(span["start_vector"]), list(span["end_vector"]))
+        if span_vectors == vectors:
+            return span_id
+    return None
+
+# adds span from start_obj to end_obj to registry (or gets span that is already there) and returns its id
+# start_vector and end_vector are local coordinates of wire ends for wire between vertices
+def add_span(start_obj, end_obj, start_vector=None, end_vector=None):
+    migrate_legacy(start_obj)
+    migrate_legacy(end_obj)
+    return register_span(start_obj, end_obj, start_vector, end_vector)
+
+# add_span for objects with no old properties
+def register_span(start_obj, end_obj, start_vector=None, end_vector=None):
+    registry = get_registry()
+    span_id = find_span(start_obj, end_obj, start_vector, end_vector)
+    if span_id is None:
+        span_id = new_span_id()
+        registry[span_id] = {"start": start_obj, "end": end_obj, "wires": [], "balls": []}
+        for obj in (start_obj, end_obj):
+            if obj.get("wire_spans", None) is None:
+                obj["wire_spans"] = {}
+            obj["wire_spans"][span_id] = True
+    span = registry[span_id]
+    if start_vector is not None and end_vector is not None:
+        span["start_vector"] = list(start_vector)
+        span["end_vector"] = list(end_vector)
+    return span_id
+
+# saves wire and ball objects drawn for span
+def set_span_objects(span_id, wires, balls):
+    span = get_span(span_id)
+    span["wires"] = wires
+    span["balls"] = balls
+
+# deletes wire and ball objects of span (span stays in registry)
+def remove_span_objects(span_id):
+    span = get_span(span_id)
+    objects = list(span.get("wires", [])) + list(span.get("balls", []))
+    span["wires"] = []
+    span["balls"] = []
+    wire_mesh.remove_objects(objects)
+
+# deletes wire and ball objects of span and removes span from registry and from its objects
+def remove_span(span_id):
+    registry = get_registry()
+    span = registry.get(span_id, None)
+    if span is None:
+        return
+    remove_span_objects(span_id)
+    for obj in (span.get("start", None), span.get("end", None)):
+        if obj is not None and obj.get("wire_spans", None) is not None and span_id in obj["wire_spans"]:
+            del obj["wire_spans"][span_id]
+    del registry[span_id]
+
+# moves wires saved with old "upstream"/"downstream" and "output_wire"/"input_wire" properties into registry
+def migrate_legacy(obj):
+    if "upstream" not in obj and "downstream" not in obj:
+        return
+    upstream = obj.get("upstream", None)
+    downstream = obj.get("downstream", None)
+    for start_obj, end_obj in ((obj, upstream), (downstream, obj)):
+        if start_obj is None or end_obj is None:
+            continue
+        # old properties are removed so pairs are only moved once
+        wires = list(start_obj.pop("output_wire", []) or [])
+        balls = list(start_obj.pop("output_wire_balls", []) or [])
+        start_vector = start_obj.pop("start_vector", None)
+        end_vector = end_obj.pop("end_vector", None)
+        for key in ("input_wire", "input_wire_balls"):
+            end_obj.pop(key, None)
+        if start_obj.get("upstream", None) == end_obj:
+            del start_obj["upstream"]
+        if end_obj.get("downstream", None) == start_obj:
+            del end_obj["downstream"]
+        span_id = register_span(start_obj, end_obj, start_vector, end_vector)
+        set_span_objects(span_id, wires, balls)
+    obj.pop("upstream", None)
+    obj.pop("downstream", None)
@@ -0,0 +1,59 @@
+import bpy
+import csv
+import json
+import math
+import os
+
+# routes are lines of poles read from file instead of selected by hand
+# csv file has one pole per row: route,pole,x,y,z,rotation (rotation_x and rotation_y columns can be added)
+# json file is {"route name": [{"pole": name, "location": [x, y, z], "rotation": z or [x, y, z]}, ...], ...}
+# rotations are in degrees, poles of route are in order wires go through them
+# pole is name of object in .blend file to make linked duplicates of (and name of pole in pole library)
+
+# gets routes from csv or json file as {route name: [(pole, location, rotation), ...]}
+def read_routes(filepath):
+    if os.path.splitext(filepath)[1].lower() == ".json":
+        with open(filepath, "r") as f:
+            data = json.load(f)
+        routes = {}
+        for route, poles in data.items():
+            routes[route] = [(pole["pole"], tuple(pole["location"]), get_rotation(pole.get("rotation", 0.0))) for pole in poles]
+        return routes
+    routes = {}
+    with open(filepath, "r", newline="") as f:
+        for row in csv.DictReader(f):
+            location = (float(row["x"]), float(row["y"]), float(row["z"]))
+            rotation = (float(row.get("rotation_x") or 0.0), float(row.get("rotation_y") or 0.0), float(row.get("rotation") or 0.0))
+            routes.setdefault(row["route"], []).append((row["pole"], location, rotation))
+    return routes
+
+# gets (x, y, z) rotation in degrees from single z rotation or list
+def get_rotation(rotation):
+    if isinstance(rotation, (int, float)):
+        return (0.0, 0.0, float(rotation))
+    return tuple(float(value) for value in rotation)
+
+# makes linked duplicates (same mesh as pole object) of poles of every route, each route in its own collection
+# returns {route name: [pole objects]}, poles with no object to duplicate are left out
+def place_poles(routes):
+    route_poles = {}
+    for route, poles in routes.items():
+        collection = bpy.data.collections.new(f"route_{route}")
+        bpy.context.scene.collection.children.link(collection)
+        objects = []
+        for pole, location, rotation in poles:
+            template = bpy.data.objects.get(pole)
+            if template is None:
+                print(f"no object {pole} to place for route {route}")
+                continue
+            # blender adds .001 and so on to name, name before "." is still name in pole library
+            obj = bpy.data.objects.new(template.name, template.data)
+            obj.location = location
+            obj.rotation_euler = [math.radians(value) for value in rotation]
+            obj.scale = template.scale
+            collection.objects.link(obj)
+            objects.append(obj)
+        route_poles[route] = objects
+    # world matrices of all new poles are worked out once
+    bpy.context.view_layer.update()
+    return route_poles
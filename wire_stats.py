@@ -0,0 +1,178 @@
+import bpy
+import contextlib
+import cProfile
+import functools
+import importlib
+import io
+import json
+import os
+import pstats
+import time
+from bpy_extras.io_utils import ExportHelper
+
+# stats record time and calls of every stage of drawing wires and count what was made
+# stage functions are only replaced with timed versions while stats are on, so they cost nothing when off
+# cProfile can also be run around draw operator and update handlers
+
+# (module name, function name, stage) timed while stats are on
+# only outermost function of each stage is timed, so time of stage is not counted twice
+STAGE_FUNCTIONS = (
+    ("wire_ops", "get_mushroom", "pole lookup"),
+    ("wire_ops", "get_coordinates", "coordinates"),
+    # wires drawn by operators and handlers are worked out together (sampling, tubes and ball centers),
+    # stages inside it are only timed when wires are worked out in blender (not in process pool)
+    ("wire_ops", "get_wire_parts", "geometry"),
+    ("wire_geometry", "sample_spans", "sampling"),
+    ("wire_geometry", "sample_span", "sampling"),
+    ("wire_geometry", "bezier_points", "sampling"),
+    ("wire_geometry", "sweep_tube", "tube"),
+    ("wire_geometry", "ball_data", "balls"),
+    ("wire_geometry", "ball_centers", "balls"),
+    ("wire_mesh", "fill_mesh", "mesh"),
+    ("wire_mesh", "set_vertices", "mesh"),
+    ("wire_mesh", "link_object", "linking"),
+    ("wire_mesh", "remove_objects", "cleanup"),
+)
+
+# stage -> [seconds, calls], counter -> amount
+stages = {}
+counters = {}
+# enabled, profiler (cProfile while profiling) and depth of measure blocks running
+state = {"enabled": False, "profiler": None, "depth": 0}
+# functions replaced with timed versions: (module name, function name) -> (module, original function)
+originals = {}
+
+# adds time and call to stage
+def add_time(stage, seconds):
+    entry = stages.setdefault(stage, [0.0, 0])
+    entry[0] += seconds
+    entry[1] += 1
+
+def add_count(counter, amount):
+    counters[counter] = counters.get(counter, 0) + amount
+
+# counts what stage function made
+def count_made(name, args, kwargs):
+    if name == "fill_mesh":
+        add_count("vertices", len(args[1]))
+        faces = args[3] if len(args) > 3 else kwargs.get("faces", None)
+        if faces is not None:
+            add_count("faces", len(faces[1]))
+    elif name == "set_vertices":
+        add_count("vertices rewritten", len(args[1]))
+    elif name == "link_object":
+        add_count("objects", 1)
+    elif name == "remove_objects":
+        add_count("objects removed", len(args[0]))
+
+# gets function that times function as stage
+def timed(stage, name, function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        add_time(stage, time.perf_counter() - start)
+        count_made(name, args, kwargs)
+        return result
+    return wrapper
+
+# starts recording (profiling too if profile is True)
+def enable(profile=False):
+    if not state["enabled"]:
+        for module_name, name, stage in STAGE_FUNCTIONS:
+            module = importlib.import_module(f".{module_name}", __package__)
+            original = getattr(module, name)
+            originals[(module.__name__, name)] = (module, original)
+            setattr(module, name, timed(stage, name, original))
+        state["enabled"] = True
+    state["profiler"] = cProfile.Profile() if profile else None
+
+# stops recording, recorded stats are kept
+def disable():
+    for (module_name, name), (module, original) in originals.items():
+        setattr(module, name, original)
+    originals.clear()
+    state["enabled"] = False
+
+def reset():
+    stages.clear()
+    counters.clear()
+    if state["profiler"] is not None:
+        state["profiler"] = cProfile.Profile()
+
+# times block as stage (and profiles it if profiling) while stats are on
+@contextlib.contextmanager
+def measure(stage):
+    if not state["enabled"]:
+        yield
+        return
+    profiler = state["profiler"]
+    # only outermost block is profiled (profiler can not be started twice)
+    profiling = profiler is not None and state["depth"] == 0
+    state["depth"] += 1
+    if profiling:
+        profiler.enable()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time(stage, time.perf_counter() - start)
+        if profiling:
+            profiler.disable()
+        state["depth"] -= 1
+
+# gets stats as dict that can be saved as json
+def get_stats():
+    stats = {
+        "stages": {stage: {"seconds": seconds, "calls": calls} for stage, (seconds, calls) in stages.items()},
+        "counters": dict(counters),
+    }
+    if state["profiler"] is not None:
+        text = io.StringIO()
+        pstats.Stats(state["profiler"], stream=text).sort_stats("cumulative").print_stats(30)
+        stats["profile"] = text.getvalue()
+    return stats
+
+# writes stats to json file (and profile to .prof file next to it that can be opened with pstats or snakeviz)
+def dump(filepath):
+    with open(filepath, "w") as f:
+        json.dump(get_stats(), f, indent=2)
+    if state["profiler"] is not None:
+        state["profiler"].dump_stats(f"{os.path.splitext(filepath)[0]}.prof")
+
+# starts or stops recording stats
+class ToggleStats(bpy.types.Operator):
+    bl_idname = "wire_stats.toggle_stats"
+    bl_label = "Record Stats"
+    bl_description = "Start or stop recording time and counts of each stage of drawing wires"
+    bl_options = {"REGISTER"}
+
+    def execute(self, context):
+        if state["enabled"]:
+            disable()
+        else:
+            enable(context.scene.wire_config.stats_profile)
+        return {"FINISHED"}
+
+class ResetStats(bpy.types.Operator):
+    bl_idname = "wire_stats.reset_stats"
+    bl_label = "Reset Stats"
+    bl_description = "Clear recorded stats"
+    bl_options = {"REGISTER"}
+
+    def execute(self, context):
+        reset()
+        return {"FINISHED"}
+
+class DumpStats(bpy.types.Operator, ExportHelper):
+    bl_idname = "wire_stats.dump_stats"
+    bl_label = "Save Stats"
+    bl_description = "Save recorded stats to json file"
+    bl_options = {"REGISTER"}
+
+    filename_ext = ".json"
+    filter_glob : bpy.props.StringProperty(default="*.json", options={"HIDDEN"})
+
+    def execute(self, context):
+        dump(self.filepath)
+        return {"FINISHED"}